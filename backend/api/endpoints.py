@@ -2,34 +2,36 @@
 API endpoints for the AI Butler application.
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
 from api.models import ChatRequest, ChatResponse
 from services.chat import ChatService
 from services.memory import MemoryService
+import os
+import json
 import logging
 
 # Configure logging
-logging.basicConfig(level=logging.INFO)
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
 logger = logging.getLogger(__name__)
 
 # Initialize router
 router = APIRouter()
 
-# Initialize services (will be done at runtime)
-chat_service = None
-memory_service = None
+def get_chat_service(request: Request) -> ChatService:
+    """Get the chat service created at application startup."""
+    return request.app.state.chat_service
 
-def get_services():
-    """Get or initialize services."""
-    global chat_service, memory_service
-    if chat_service is None:
-        chat_service = ChatService()
-    if memory_service is None:
-        memory_service = MemoryService()
-    return chat_service, memory_service
+def get_memory_service(request: Request) -> MemoryService:
+    """Get the memory service created at application startup."""
+    return request.app.state.memory_service
 
 @router.post("/ask", response_model=ChatResponse)
-async def ask_question(request: ChatRequest):
+async def ask_question(
+    request: ChatRequest,
+    chat_service: ChatService = Depends(get_chat_service),
+    memory_service: MemoryService = Depends(get_memory_service)
+):
     """
     Main chat endpoint that processes user input and returns AI response.
     
@@ -42,9 +44,6 @@ async def ask_question(request: ChatRequest):
     try:
         logger.info(f"Processing request for user: {request.user_id}")
         
-        # Get services
-        chat_service, memory_service = get_services()
-        
         # Load user memory
         user_memory = memory_service.load_memory(request.user_id)
         
@@ -53,12 +52,14 @@ async def ask_question(request: ChatRequest):
             user_input=request.user_input,
             user_id=request.user_id,
             user_memory=user_memory,
-            context=request.context
+            context=request.context,
+            model=request.model,
+            include_metadata=request.include_metadata
         )
         
         # Save updated memory if needed
         if response.memory_updated:
-            memory_service.save_memory(request.user_id, user_memory)
+            await memory_service.save_memory(request.user_id, user_memory)
         
         return response
         
@@ -66,34 +67,106 @@ async def ask_question(request: ChatRequest):
         logger.error(f"Error processing request: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+@router.post("/ask/stream")
+async def ask_question_stream(
+    request: ChatRequest,
+    chat_service: ChatService = Depends(get_chat_service),
+    memory_service: MemoryService = Depends(get_memory_service)
+):
+    """
+    Streaming chat endpoint that relays the AI response as server-sent events.
+    
+    Args:
+        request: ChatRequest containing user input and ID
+        
+    Returns:
+        StreamingResponse emitting token, tool_progress and done events
+    """
+    logger.info(f"Processing streaming request for user: {request.user_id}")
+    
+    # Load user memory
+    user_memory = memory_service.load_memory(request.user_id)
+    
+    async def event_stream():
+        try:
+            async for event in chat_service.process_request_stream(
+                user_input=request.user_input,
+                user_id=request.user_id,
+                user_memory=user_memory,
+                context=request.context,
+                model=request.model,
+                include_metadata=request.include_metadata
+            ):
+                # Save updated memory once the final response is assembled
+                if event["type"] == "done" and event["response"]["memory_updated"]:
+                    await memory_service.save_memory(request.user_id, user_memory)
+                yield f"data: {json.dumps(event, default=str)}\n\n"
+                
+        except Exception as e:
+            logger.error(f"Error processing streaming request: {str(e)}")
+            error_event = {"type": "error", "detail": f"Internal server error: {str(e)}"}
+            yield f"data: {json.dumps(error_event)}\n\n"
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
 @router.get("/memory/{user_id}")
-async def get_user_memory(user_id: str):
+async def get_user_memory(user_id: str, memory_service: MemoryService = Depends(get_memory_service)):
     """
     Retrieve user memory for debugging/development purposes.
     """
     try:
-        chat_service, memory_service = get_services()
         memory = memory_service.load_memory(user_id)
         return {"user_id": user_id, "memory": memory}
     except Exception as e:
         logger.error(f"Error loading memory for user {user_id}: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to load user memory")
 
+@router.get("/schemas")
+async def get_tool_schemas(chat_service: ChatService = Depends(get_chat_service)):
+    """
+    Return the tool schemas offered to the model, for development purposes.
+    """
+    try:
+        # The chat service's snapshot, so this never rebuilds the loader's schemas and
+        # validators behind the list actually sent with completion requests
+        return Response(content=chat_service.get_tool_schemas_bytes(), media_type="application/json")
+    except Exception as e:
+        logger.error(f"Error loading tool schemas: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to load tool schemas")
+
+@router.post("/schemas/reload")
+async def reload_tool_schemas(chat_service: ChatService = Depends(get_chat_service)):
+    """
+    Reload tool schemas from disk for development purposes.
+    """
+    try:
+        reloaded, schema_count = chat_service.reload_schemas()
+        if not reloaded:
+            return {
+                "message": "Tool schema reload failed, keeping previously loaded schemas",
+                "reloaded": False,
+                "schema_count": schema_count
+            }
+        return {"message": "Tool schemas reloaded", "reloaded": True, "schema_count": schema_count}
+    except Exception as e:
+        logger.error(f"Error reloading tool schemas: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to reload tool schemas")
+
 @router.post("/test-tools")
-async def test_tool_execution():
+async def test_tool_execution(chat_service: ChatService = Depends(get_chat_service)):
     """
     Test endpoint to verify tool call execution is working.
     """
     try:
-        chat_service, memory_service = get_services()
-        
         # Test with a simple tool request
-        test_memory = {"conversation_history": [], "preferences": {}}
+        test_memory = MemoryService.create_default_memory()
         
         response = await chat_service.process_request(
             user_input="Add a task to buy groceries",
             user_id="test_user",
-            user_memory=test_memory
+            user_memory=test_memory,
+            model="gpt-4o-mini",
+            max_tokens=256
         )
         
         return {
@@ -108,13 +181,11 @@ async def test_tool_execution():
         raise HTTPException(status_code=500, detail=f"Tool execution test failed: {str(e)}")
 
 @router.get("/test-todoist")
-async def test_todoist_integration():
+async def test_todoist_integration(chat_service: ChatService = Depends(get_chat_service)):
     """
     Test endpoint to verify Todoist API integration.
     """
     try:
-        chat_service, memory_service = get_services()
-        
         # Test Todoist service directly
         todoist_service = chat_service.todoist_service
         
@@ -10,6 +10,8 @@ class ChatRequest(BaseModel):
     user_input: str = Field(..., description="User's message or question")
     user_id: str = Field(..., description="Unique identifier for the user")
     context: Optional[Dict[str, Any]] = Field(default=None, description="Additional context for the request")
+    model: Optional[str] = Field(default=None, description="OpenAI model override for this request")
+    include_metadata: bool = Field(default=True, description="Whether to return tool calls and results in response metadata")
     
 class ChatResponse(BaseModel):
     """Response model for chat interactions."""
@@ -24,4 +26,5 @@ class ToolCall(BaseModel):
     """Model for structured tool calls."""
     action: str = Field(..., description="Name of the action to perform")
     args: Dict[str, Any] = Field(default_factory=dict, description="Arguments for the action")
-    confidence: float = Field(default=1.0, description="Confidence score for this tool call") 
\ No newline at end of file
+    confidence: float = Field(default=1.0, description="Confidence score for this tool call")
+    tool_call_id: Optional[str] = Field(default=None, description="OpenAI tool call ID this call answers to") 
\ No newline at end of file
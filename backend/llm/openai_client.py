@@ -3,12 +3,88 @@ OpenAI client wrapper for GPT-4o chat completions.
 """
 
 import os
+import time
+import random
+import asyncio
+import hashlib
 import logging
-from typing import Dict, Any, List, Optional
-from openai import OpenAI
+from typing import Dict, Any, List, Optional, AsyncIterator
+import httpx
+import orjson
+from cachetools import TTLCache
+from openai import AsyncOpenAI, OpenAI, APIConnectionError, AuthenticationError, InternalServerError, RateLimitError
 
 logger = logging.getLogger(__name__)
 
+# Shared HTTP connection pool so every AsyncOpenAI instance in the process
+# reuses keep-alive sockets instead of paying a TCP+TLS handshake per request
+shared_http_client = httpx.AsyncClient(
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=50, keepalive_expiry=60),
+    http2=True,
+    timeout=httpx.Timeout(60.0, connect=5.0)
+)
+
+# Responses to identical deterministic (temperature 0) requests are reused for an hour
+RESPONSE_CACHE_SIZE = 1024
+RESPONSE_CACHE_TTL = 3600
+
+class RateLimiter:
+    """
+    Request/token budget for OpenAI calls, refilled continuously per second.
+    
+    Mirrors the capacity tracking in the OpenAI cookbook's parallel request
+    processor, with a semaphore capping the number of in-flight requests.
+    """
+    
+    def __init__(self, max_requests_per_minute: int, max_tokens_per_minute: int, max_concurrent: int):
+        """
+        Initialize the rate limiter.
+        
+        Args:
+            max_requests_per_minute: Request budget per minute
+            max_tokens_per_minute: Token budget per minute
+            max_concurrent: Maximum number of requests in flight at once
+        """
+        self.max_requests_per_minute = max_requests_per_minute
+        self.max_tokens_per_minute = max_tokens_per_minute
+        self.available_request_capacity = float(max_requests_per_minute)
+        self.available_token_capacity = float(max_tokens_per_minute)
+        self.last_update_time = time.monotonic()
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+        self._lock = asyncio.Lock()
+    
+    def _refill(self):
+        """Top up capacity in proportion to the time elapsed since the last refill."""
+        now = time.monotonic()
+        elapsed = now - self.last_update_time
+        self.available_request_capacity = min(
+            self.available_request_capacity + self.max_requests_per_minute * elapsed / 60.0,
+            float(self.max_requests_per_minute)
+        )
+        self.available_token_capacity = min(
+            self.available_token_capacity + self.max_tokens_per_minute * elapsed / 60.0,
+            float(self.max_tokens_per_minute)
+        )
+        self.last_update_time = now
+    
+    async def acquire(self, token_estimate: int):
+        """
+        Wait until there is capacity for one request consuming token_estimate tokens.
+        
+        Args:
+            token_estimate: Estimated tokens the request will consume
+        """
+        # Never wait for more tokens than the bucket can ever hold
+        token_estimate = min(token_estimate, self.max_tokens_per_minute)
+        while True:
+            async with self._lock:
+                self._refill()
+                if self.available_request_capacity >= 1 and self.available_token_capacity >= token_estimate:
+                    self.available_request_capacity -= 1
+                    self.available_token_capacity -= token_estimate
+                    return
+            await asyncio.sleep(0.05)
+
 class OpenAIClient:
     """Wrapper for OpenAI API client with GPT-4o support."""
     
@@ -19,16 +95,186 @@ class OpenAIClient:
         if not self.api_key:
             raise ValueError("OPENAI_API_KEY environment variable is required")
         
-        # Configure OpenAI client
-        self.client = OpenAI(api_key=self.api_key)
+        # Configure OpenAI clients (async for request handlers, sync for blocking callers)
+        # SDK retries are disabled: _create_completion retries itself so every attempt
+        # passes through the rate limiter
+        self.client = AsyncOpenAI(api_key=self.api_key, http_client=shared_http_client, max_retries=0)
+        self.sync_client = OpenAI(api_key=self.api_key)
         
         # Default model and parameters
-        self.default_model = "gpt-4o"
+        self.default_model = os.getenv("OPENAI_DEFAULT_MODEL", "gpt-4o-mini")
         self.default_temperature = 0.7
         self.default_max_tokens = 1000
+        self._base_params = {
+            "model": self.default_model,
+            "temperature": self.default_temperature,
+            "max_tokens": self.default_max_tokens
+        }
+        
+        # Concurrency and rate limits for outgoing requests
+        self.rate_limiter = RateLimiter(
+            max_requests_per_minute=int(os.getenv("OPENAI_MAX_REQUESTS_PER_MINUTE", "500")),
+            max_tokens_per_minute=int(os.getenv("OPENAI_MAX_TOKENS_PER_MINUTE", "30000")),
+            max_concurrent=int(os.getenv("OPENAI_MAX_CONCURRENT_REQUESTS", "16"))
+        )
+        self.max_retries = 5
+        
+        # Cache for deterministic completions, keyed by a hash of the request parameters
+        self._response_cache: TTLCache = TTLCache(maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL)
+        self._response_cache_lock = asyncio.Lock()
         
         logger.info("OpenAI client initialized")
     
+    def _response_cache_key(self, request_params: Dict[str, Any]) -> Optional[bytes]:
+        """
+        Build a cache key for a request, or None if its response must not be cached.
+        
+        Args:
+            request_params: Parameters for chat.completions.create
+            
+        Returns:
+            Digest of the request parameters for temperature 0 requests, otherwise None
+        """
+        # Sampled responses are non-deterministic, so only temperature 0 is cacheable
+        if request_params.get("temperature") != 0 or request_params.get("stream"):
+            return None
+        return hashlib.blake2b(orjson.dumps(request_params, option=orjson.OPT_SORT_KEYS), digest_size=16).digest()
+    
+    def prompt_cache_key(self, messages: List[Dict[str, Any]]) -> str:
+        """
+        Build a prompt cache routing key from the stable prefix of a conversation.
+        
+        Calls that share the key, such as a turn's first completion and its
+        follow-up after tool execution, are routed to the same prompt cache.
+        
+        Args:
+            messages: Conversation messages; the latest message is excluded from the key
+            
+        Returns:
+            Hex digest of the message prefix
+        """
+        return hashlib.blake2b(orjson.dumps(messages[:-1], option=orjson.OPT_SORT_KEYS), digest_size=16).hexdigest()
+    
+    async def _create_completion(self, request_params: Dict[str, Any]) -> Any:
+        """
+        Issue a chat completion request within the rate limits, retrying on 429s,
+        connection errors and 5xx responses.
+        
+        Args:
+            request_params: Parameters for chat.completions.create
+            
+        Returns:
+            The OpenAI response (or stream when request_params sets stream=True)
+        """
+        # Rough token estimate: ~4 characters per prompt token plus the completion budget
+        prompt_chars = sum(len(str(message.get("content") or "")) for message in request_params["messages"])
+        token_estimate = prompt_chars // 4 + request_params.get("max_tokens", 0)
+        
+        async with self.rate_limiter.semaphore:
+            for attempt in range(self.max_retries + 1):
+                await self.rate_limiter.acquire(token_estimate)
+                try:
+                    return await self.client.chat.completions.create(**request_params)
+                except (RateLimitError, APIConnectionError, InternalServerError) as e:
+                    if attempt == self.max_retries:
+                        raise
+                    delay = min(2 ** attempt, 30) + random.random()
+                    logger.warning(f"OpenAI request failed ({type(e).__name__}), retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+    
+    async def batch_completions(
+        self,
+        message_lists: List[List[Dict[str, str]]],
+        **kwargs
+    ) -> List[tuple[str, Any]]:
+        """
+        Run independent chat completions concurrently.
+        
+        Args:
+            message_lists: One message list per completion
+            **kwargs: Parameters passed to every chat_completion_with_response call
+            
+        Returns:
+            List of (content, full_response_object) tuples in input order
+        """
+        return await asyncio.gather(*[
+            self.chat_completion_with_response(messages=messages, **kwargs)
+            for messages in message_lists
+        ])
+    
+    def _build_request_params(
+        self,
+        messages: List[Dict[str, str]],
+        tools: Optional[List[Dict[str, Any]]],
+        model: Optional[str],
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Merge per-call arguments over the default request parameters.
+        
+        Args:
+            messages: List of message dictionaries with 'role' and 'content'
+            tools: Optional list of tool schemas for function calling
+            model: Model override
+            temperature: Sampling temperature override
+            max_tokens: Maximum tokens override
+            **kwargs: Additional parameters for the API call
+            
+        Returns:
+            Parameters for chat.completions.create
+        """
+        overrides = {"model": model, "temperature": temperature, "max_tokens": max_tokens}
+        prompt_cache_key = kwargs.pop("prompt_cache_key", None)
+        request_params = {
+            **self._base_params,
+            **{key: value for key, value in overrides.items() if value is not None},
+            "messages": messages,
+            **kwargs
+        }
+        
+        # Add tools if provided
+        if tools:
+            request_params["tools"] = tools
+            request_params["tool_choice"] = "auto"
+        
+        # Sent in the body so it also works with SDK versions without the typed parameter
+        if prompt_cache_key:
+            request_params["extra_body"] = {**request_params.get("extra_body", {}), "prompt_cache_key": prompt_cache_key}
+        
+        return request_params
+    
+    def _extract_content(self, response: Any) -> str:
+        """
+        Extract the response text from a chat completion.
+        
+        Args:
+            response: OpenAI chat completion response
+            
+        Returns:
+            Response text, or a placeholder when the model returned tool calls or nothing
+        """
+        logger.debug("Response id=%s usage=%s", getattr(response, "id", None), getattr(response, "usage", None))
+        
+        if not (response and getattr(response, 'choices', None)):
+            logger.warning("No choices in OpenAI response (id=%s)", getattr(response, "id", None))
+            return "No response generated"
+        
+        message = response.choices[0].message
+        
+        # Handle tool calls
+        if getattr(message, 'tool_calls', None):
+            logger.info(f"Received {len(message.tool_calls)} tool calls")
+            return f"I can help you with that! I detected {len(message.tool_calls)} action(s) I can take."
+        
+        if not message.content:
+            logger.warning("No content in response")
+            return "I received a response but it was empty."
+        
+        logger.info(f"Received response with {len(message.content)} characters")
+        return message.content
+    
     async def chat_completion(
         self,
         messages: List[Dict[str, str]],
@@ -44,7 +290,7 @@ class OpenAIClient:
         Args:
             messages: List of message dictionaries with 'role' and 'content'
             tools: Optional list of tool schemas for function calling
-            model: Model to use (defaults to gpt-4o)
+            model: Model to use (defaults to OPENAI_DEFAULT_MODEL)
             temperature: Sampling temperature (0-2)
             max_tokens: Maximum tokens to generate
             **kwargs: Additional parameters for the API call
@@ -52,58 +298,15 @@ class OpenAIClient:
         Returns:
             Generated response text
         """
-        try:
-            # Set default values
-            model = model or self.default_model
-            temperature = temperature or self.default_temperature
-            max_tokens = max_tokens or self.default_max_tokens
-            
-            # Prepare request parameters
-            request_params = {
-                "model": model,
-                "messages": messages,
-                "temperature": temperature,
-                "max_tokens": max_tokens,
-                **kwargs
-            }
-            
-            # Add tools if provided
-            if tools:
-                request_params["tools"] = tools
-                request_params["tool_choice"] = "auto"
-            
-            logger.info(f"Making OpenAI API request with model: {model}")
-            
-            # Make the API call
-            response = self.client.chat.completions.create(**request_params)
-            
-            # Extract the response content
-            logger.info(f"Response type: {type(response)}")
-            logger.info(f"Response: {response}")
-            
-            if response and hasattr(response, 'choices') and response.choices and len(response.choices) > 0:
-                choice = response.choices[0]
-                
-                # Handle tool calls
-                if getattr(choice.message, 'tool_calls', None):
-                    logger.info(f"Received {len(choice.message.tool_calls)} tool calls")
-                    return f"I can help you with that! I detected {len(choice.message.tool_calls)} action(s) I can take."
-                
-                # Return the content
-                content = choice.message.content
-                if content:
-                    logger.info(f"Received response with {len(content)} characters")
-                    return content
-                else:
-                    logger.warning("No content in response")
-                    return "I received a response but it was empty."
-            else:
-                logger.warning(f"No choices in OpenAI response. Response: {response}")
-                return "No response generated"
-                
-        except Exception as e:
-            logger.error(f"OpenAI API error: {str(e)}")
-            raise
+        content, _ = await self.chat_completion_with_response(
+            messages=messages,
+            tools=tools,
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **kwargs
+        )
+        return content
     
     async def chat_completion_with_response(
         self,
@@ -120,7 +323,7 @@ class OpenAIClient:
         Args:
             messages: List of message dictionaries with 'role' and 'content'
             tools: Optional list of tool schemas for function calling
-            model: Model to use (defaults to gpt-4o)
+            model: Model to use (defaults to OPENAI_DEFAULT_MODEL)
             temperature: Sampling temperature (0-2)
             max_tokens: Maximum tokens to generate
             **kwargs: Additional parameters for the API call
@@ -129,49 +332,67 @@ class OpenAIClient:
             Tuple of (content, full_response_object)
         """
         try:
-            # Set default values
-            model = model or self.default_model
-            temperature = temperature or self.default_temperature
-            max_tokens = max_tokens or self.default_max_tokens
+            request_params = self._build_request_params(messages, tools, model, temperature, max_tokens, **kwargs)
             
-            # Prepare request parameters
-            request_params = {
-                "model": model,
-                "messages": messages,
-                "temperature": temperature,
-                "max_tokens": max_tokens,
-                **kwargs
-            }
+            # Serve repeated deterministic requests from the cache
+            cache_key = self._response_cache_key(request_params)
+            if cache_key is not None:
+                async with self._response_cache_lock:
+                    cached = self._response_cache.get(cache_key)
+                if cached is not None:
+                    logger.debug("OpenAI response cache hit")
+                    return cached
             
-            # Add tools if provided
-            if tools:
-                request_params["tools"] = tools
-                request_params["tool_choice"] = "auto"
-            
-            logger.info(f"Making OpenAI API request with model: {model}")
+            logger.info(f"Making OpenAI API request with model: {request_params['model']}")
             
             # Make the API call
-            response = self.client.chat.completions.create(**request_params)
+            response = await self._create_completion(request_params)
+            result = (self._extract_content(response), response)
             
-            # Extract the response content
-            logger.info(f"Response type: {type(response)}")
+            if cache_key is not None:
+                async with self._response_cache_lock:
+                    self._response_cache[cache_key] = result
             
-            if response and hasattr(response, 'choices') and response.choices and len(response.choices) > 0:
-                choice = response.choices[0]
-                
-                # Handle tool calls
-                if getattr(choice.message, 'tool_calls', None):
-                    logger.info(f"Received {len(choice.message.tool_calls)} tool calls")
-                    content = f"I can help you with that! I detected {len(choice.message.tool_calls)} action(s) I can take."
-                else:
-                    # Return the content
-                    content = choice.message.content or "I received a response but it was empty."
+            return result
                 
-                logger.info(f"Received response with {len(content)} characters")
-                return content, response
-            else:
-                logger.warning(f"No choices in OpenAI response. Response: {response}")
-                return "No response generated", response
+        except Exception as e:
+            logger.error(f"OpenAI API error: {str(e)}")
+            raise
+    
+    async def chat_completion_stream(
+        self,
+        messages: List[Dict[str, str]],
+        tools: Optional[List[Dict[str, Any]]] = None,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> AsyncIterator[Any]:
+        """
+        Stream a chat completion from GPT-4o.
+        
+        Args:
+            messages: List of message dictionaries with 'role' and 'content'
+            tools: Optional list of tool schemas for function calling
+            model: Model to use (defaults to OPENAI_DEFAULT_MODEL)
+            temperature: Sampling temperature (0-2)
+            max_tokens: Maximum tokens to generate
+            **kwargs: Additional parameters for the API call
+            
+        Yields:
+            Delta objects carrying response text and/or partial tool calls
+        """
+        try:
+            request_params = self._build_request_params(
+                messages, tools, model, temperature, max_tokens, stream=True, **kwargs
+            )
+            logger.info(f"Making streaming OpenAI API request with model: {request_params['model']}")
+            
+            # Make the API call and relay deltas as they arrive
+            stream = await self._create_completion(request_params)
+            async for chunk in stream:
+                if chunk.choices:
+                    yield chunk.choices[0].delta
                 
         except Exception as e:
             logger.error(f"OpenAI API error: {str(e)}")
@@ -192,7 +413,7 @@ class OpenAIClient:
         Args:
             messages: List of message dictionaries with 'role' and 'content'
             tools: Optional list of tool schemas for function calling
-            model: Model to use (defaults to gpt-4o)
+            model: Model to use (defaults to OPENAI_DEFAULT_MODEL)
             temperature: Sampling temperature (0-2)
             max_tokens: Maximum tokens to generate
             **kwargs: Additional parameters for the API call
@@ -201,44 +422,12 @@ class OpenAIClient:
             Generated response text
         """
         try:
-            # Set default values
-            model = model or self.default_model
-            temperature = temperature or self.default_temperature
-            max_tokens = max_tokens or self.default_max_tokens
-            
-            # Prepare request parameters
-            request_params = {
-                "model": model,
-                "messages": messages,
-                "temperature": temperature,
-                "max_tokens": max_tokens,
-                **kwargs
-            }
-            
-            # Add tools if provided
-            if tools:
-                request_params["tools"] = tools
-                request_params["tool_choice"] = "auto"
-            
-            logger.info(f"Making synchronous OpenAI API request with model: {model}")
+            request_params = self._build_request_params(messages, tools, model, temperature, max_tokens, **kwargs)
+            logger.info(f"Making synchronous OpenAI API request with model: {request_params['model']}")
             
             # Make the API call
-            response = self.client.chat.completions.create(**request_params)
-            
-            # Extract the response content
-            logger.info(f"Response type: {type(response)}")
-            logger.info(f"Response: {response}")
-            
-            if response and hasattr(response, 'choices') and response.choices and len(response.choices) > 0:
-                choice = response.choices[0]
-                
-                # Return the content (tool calls will be handled separately)
-                content = choice.message.content
-                logger.info(f"Received response with {len(content)} characters")
-                return content
-            else:
-                logger.warning(f"No choices in OpenAI response. Response: {response}")
-                return "No response generated"
+            response = self.sync_client.chat.completions.create(**request_params)
+            return self._extract_content(response)
                 
         except Exception as e:
             logger.error(f"OpenAI API error: {str(e)}")
@@ -252,26 +441,32 @@ class OpenAIClient:
             List of available models
         """
         try:
-            models = self.client.models.list()
+            models = self.sync_client.models.list()
             return [model.model_dump() for model in models.data]
         except Exception as e:
             logger.error(f"Error fetching models: {str(e)}")
             return []
     
-    def validate_api_key(self) -> bool:
+    async def validate_api_key(self) -> bool:
         """
-        Validate the OpenAI API key.
+        Validate the OpenAI API key with a minimal 1-token completion.
         
         Returns:
             True if valid, False otherwise
         """
         try:
-            # Try to list models as a simple validation
-            models = self.get_models()
-            return len(models) > 0
-        except Exception as e:
+            await self.client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[{"role": "user", "content": "hi"}],
+                max_tokens=1
+            )
+            return True
+        except AuthenticationError as e:
             logger.error(f"API key validation failed: {str(e)}")
             return False
+        except Exception as e:
+            logger.error(f"API key validation request failed: {str(e)}")
+            return False
     
     def get_usage_stats(self) -> Dict[str, Any]:
         """
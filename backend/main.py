@@ -4,19 +4,48 @@ Bootstraps the FastAPI app and includes the /ask endpoint.
 """
 
 import os
+import logging
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from api.endpoints import router
+from llm.openai_client import shared_http_client
+from services.chat import ChatService
+from services.memory import MemoryService
 
 # Load environment variables from .env file
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create shared services at startup and release their resources at shutdown."""
+    app.state.chat_service = ChatService()
+    app.state.memory_service = MemoryService()
+    
+    # Checking the key costs an API round-trip, so it only runs when asked for
+    if os.getenv("VALIDATE_OPENAI_KEY_ON_BOOT") == "1":
+        if not await app.state.chat_service.openai_client.validate_api_key():
+            logger.warning("OpenAI API key validation failed")
+    
+    yield
+    
+    # Flush pending memory writes and close the database and HTTP connection pools
+    await app.state.memory_service.flush_all()
+    app.state.memory_service.close()
+    await app.state.chat_service.todoist_service.aclose()
+    await shared_http_client.aclose()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Tietaja API",
     description="AI assistant with memory and Todoist integration",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Add CORS middleware
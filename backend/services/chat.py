@@ -4,15 +4,40 @@ Chat service for handling prompt construction and GPT-4o interactions.
 
 from api.models import ChatResponse, ToolCall
 from llm.openai_client import OpenAIClient
-from utils.parser import parse_tool_calls, parse_openai_tool_calls
+from utils.parser import parse_tool_calls, parse_openai_tool_calls, parse_streamed_tool_calls
 from services.todoist_mcp import TodoistMCPService
-from services.schema_loader import SchemaLoader
+from services.schema_loader import get_schema_loader
+from services.memory import MemoryService
+import json
+import time
+import asyncio
 import logging
-from typing import Dict, Any, List, Optional
-from datetime import datetime
+from collections import Counter
+from itertools import islice
+from typing import Dict, Any, List, Optional, AsyncIterator, Awaitable, Callable, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Model used for user-facing chat unless the request overrides it
+CHAT_MODEL = "gpt-4o"
+
+# Most recent interactions sent verbatim; older ones are sent as one-line summaries
+FULL_HISTORY_TURNS = 3
+SUMMARY_TEXT_LIMIT = 80
+
+# Dispatch entry for actions missing from the table; unknown calls are harmless to batch
+_UNKNOWN_TOOL = (None, None, True)
+
+# Tool message content for tool calls that could not be parsed and were never executed
+_NOT_EXECUTED_RESULT = {"error": "Tool call was not executed: its arguments could not be parsed"}
+
+SYSTEM_PROMPT_BASE = (
+    "You are a concise AI assistant that manages the user's Todoist tasks and remembers their preferences. "
+    "Use the provided tools whenever the user asks for an action.\n"
+    "For bulk operations, finish the whole request: get_projects to find the project ID, "
+    "get_tasks with that project_id, then delete_task for every task found."
+)
+
 class ChatService:
     """Service for handling chat interactions with GPT-4o."""
     
@@ -20,14 +45,71 @@ class ChatService:
         """Initialize the chat service with required components."""
         self.openai_client = OpenAIClient()
         self.todoist_service = TodoistMCPService()
-        self.schema_loader = SchemaLoader()
+        self.schema_loader = get_schema_loader()
+        
+        # Tool schemas are static at runtime, so load them once
+        self._set_tool_schemas(self.schema_loader.get_available_schemas())
+        
+        # Map each tool action to its handler, the tool name reported in tools_used,
+        # and whether it may run concurrently with other calls from the same turn.
+        # Completing or updating a task changes state a neighbouring call may depend on
+        # (e.g. update then complete the same task), so those keep their turn order.
+        self._tool_dispatch: Dict[str, Tuple[Callable[..., Awaitable[Any]], str, bool]] = {
+            "add_task": (self.todoist_service.add_task, "todoist_add_task", True),
+            "get_projects": (lambda **kwargs: self.todoist_service.get_projects(), "todoist_get_projects", True),
+            "get_tasks": (self.todoist_service.get_tasks, "todoist_get_tasks", True),
+            "complete_task": (self.todoist_service.close_task, "todoist_complete_task", False),
+            "delete_task": (self.todoist_service.delete_task, "todoist_delete_task", True),
+            "update_task": (self.todoist_service.update_task, "todoist_update_task", False)
+        }
+    
+    def reload_schemas(self) -> Tuple[bool, int]:
+        """
+        Reload tool schemas from disk, e.g. after editing schema files during development.
+        
+        The cached schemas are only replaced when the reload succeeds, so a broken
+        schema file never leaves requests without tools.
+        
+        Returns:
+            Tuple of whether the reload succeeded and the number of tool schemas now available
+        """
+        schemas = self.schema_loader.get_available_schemas() if self.schema_loader.reload_schemas() else []
+        if not schemas:
+            logger.warning("Schema reload failed, keeping previously loaded tool schemas")
+            return False, len(self._tool_schemas)
+        self._set_tool_schemas(schemas)
+        logger.info(f"Reloaded {len(self._tool_schemas)} tool schemas")
+        return True, len(self._tool_schemas)
+    
+    def _set_tool_schemas(self, schemas: List[Dict[str, Any]]):
+        """
+        Replace the tool schemas offered to the model, together with their JSON encoding.
+        
+        Args:
+            schemas: Tool schemas in OpenAI format
+        """
+        self._tool_schemas = schemas
+        # Encoded once per load so GET /schemas never re-encodes the list
+        self._tool_schemas_bytes = json.dumps(schemas, separators=(",", ":")).encode()
+    
+    def get_tool_schemas_bytes(self) -> bytes:
+        """
+        Get the tool schemas currently offered to the model, serialized as a JSON array.
+        
+        Returns:
+            UTF-8 JSON bytes of the schemas passed to every completion request
+        """
+        return self._tool_schemas_bytes
         
     async def process_request(
         self, 
         user_input: str, 
         user_id: str, 
         user_memory: Dict[str, Any],
-        context: Optional[Dict[str, Any]] = None
+        context: Optional[Dict[str, Any]] = None,
+        model: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        include_metadata: bool = True
     ) -> ChatResponse:
         """
         Process a user request and return an AI response.
@@ -37,6 +119,9 @@ class ChatService:
             user_id: Unique user identifier
             user_memory: User's conversation history and preferences
             context: Additional context for the request
+            model: Model override (defaults to gpt-4o)
+            max_tokens: Maximum tokens per completion (defaults to the client default)
+            include_metadata: Whether to attach tool calls, tool results and context as metadata
             
         Returns:
             ChatResponse with AI response and metadata
@@ -52,15 +137,21 @@ class ChatService:
             debug_trace.append(f"✅ Built conversation with {len(messages)} messages")
             
             # Get available tool schemas
-            debug_trace.append("🔧 Loading available tool schemas...")
-            tool_schemas = self.schema_loader.get_available_schemas()
+            debug_trace.append("🔧 Using cached tool schemas...")
+            tool_schemas = self._tool_schemas
             debug_trace.append(f"✅ Found {len(tool_schemas) if tool_schemas else 0} available tools")
             
             # Call GPT-4o with tools and get full response
             debug_trace.append("🤖 Sending conversation to GPT-4o with tools...")
+            model = model or CHAT_MODEL
+            # The follow-up call extends this conversation, so both share one prompt cache key
+            prompt_cache_key = self.openai_client.prompt_cache_key(messages)
             gpt_response, openai_response = await self.openai_client.chat_completion_with_response(
                 messages=messages,
-                tools=tool_schemas
+                tools=tool_schemas,
+                model=model,
+                max_tokens=max_tokens,
+                prompt_cache_key=prompt_cache_key
             )
             debug_trace.append("✅ Received response from GPT-4o")
             
@@ -73,16 +164,20 @@ class ChatService:
             tool_results = []
             if tool_calls:
                 debug_trace.append(f"⚡ Executing {len(tool_calls)} tool calls...")
-                logger.info(f"Tool calls: {tool_calls}")
+                logger.debug("Tool calls: %s", tool_calls)
                 tools_used, tool_results = await self._execute_tool_calls(tool_calls, user_id)
                 debug_trace.append(f"✅ Completed {len(tools_used)} tool executions")
                 
                 # If tools were executed, get a follow-up response from GPT
                 if tool_results:
                     debug_trace.append("🔄 Getting follow-up response after tool execution...")
-                    follow_up_messages = self._build_follow_up_messages(user_input, tool_results, messages)
+                    assistant_message = openai_response.choices[0].message.model_dump(exclude_none=True)
+                    follow_up_messages = self._build_follow_up_messages(messages, assistant_message, tool_results)
                     gpt_response, _ = await self.openai_client.chat_completion_with_response(
-                        messages=follow_up_messages
+                        messages=follow_up_messages,
+                        model=model,
+                        max_tokens=max_tokens,
+                        prompt_cache_key=prompt_cache_key
                     )
                     debug_trace.append("✅ Received follow-up response")
             else:
@@ -91,20 +186,18 @@ class ChatService:
             
             # Update user memory with this interaction
             debug_trace.append("💾 Updating user memory...")
-            memory_updated = self._update_memory(user_memory, user_input, gpt_response, tools_used)
-            debug_trace.append(f"✅ Memory updated: {memory_updated}")
+            if not user_memory:
+                user_memory = MemoryService.create_default_memory()
+            user_memory = self._update_memory(user_memory, user_input, gpt_response, tools_used)
+            debug_trace.append("✅ Memory updated")
             
             return ChatResponse(
                 response=gpt_response,
                 user_id=user_id,
-                memory_updated=memory_updated,
+                memory_updated=True,
                 tools_used=tools_used if tools_used else None,
                 debug_trace=debug_trace,
-                metadata={
-                    "tool_calls": [tc.dict() for tc in tool_calls] if tool_calls else None,
-                    "tool_results": tool_results if 'tool_results' in locals() else None,
-                    "context": context
-                }
+                metadata=self._build_metadata(tool_calls, tool_results, context) if include_metadata else None
             )
             
         except Exception as e:
@@ -112,6 +205,157 @@ class ChatService:
             logger.error(f"Error in process_request: {str(e)}")
             raise
     
+    async def process_request_stream(
+        self, 
+        user_input: str, 
+        user_id: str, 
+        user_memory: Dict[str, Any],
+        context: Optional[Dict[str, Any]] = None,
+        model: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        include_metadata: bool = True
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process a user request and stream the AI response as it is generated.
+        
+        Args:
+            user_input: The user's message
+            user_id: Unique user identifier
+            user_memory: User's conversation history and preferences
+            context: Additional context for the request
+            model: Model override (defaults to gpt-4o)
+            max_tokens: Maximum tokens per completion (defaults to the client default)
+            include_metadata: Whether to attach tool calls, tool results and context as metadata
+            
+        Yields:
+            Event dictionaries: "token" events with response text, a "tool_progress"
+            event before tool execution, and a final "done" event with the ChatResponse
+        """
+        try:
+            messages = self._build_conversation_messages(user_input, user_memory, context)
+            tool_schemas = self._tool_schemas
+            
+            # Stream the first completion, collecting any tool calls it emits
+            response_parts = []
+            streamed_calls: Dict[int, Dict[str, str]] = {}
+            model = model or CHAT_MODEL
+            prompt_cache_key = self.openai_client.prompt_cache_key(messages)
+            async for delta in self.openai_client.chat_completion_stream(
+                messages=messages,
+                tools=tool_schemas,
+                model=model,
+                max_tokens=max_tokens,
+                prompt_cache_key=prompt_cache_key
+            ):
+                if delta.content:
+                    response_parts.append(delta.content)
+                    yield {"type": "token", "content": delta.content}
+                if delta.tool_calls:
+                    self._accumulate_tool_call_deltas(streamed_calls, delta.tool_calls)
+            
+            tool_calls = parse_streamed_tool_calls(list(streamed_calls.values()))
+            
+            # Execute tool calls, then stream the follow-up response
+            tools_used = []
+            tool_results = []
+            if tool_calls:
+                yield {
+                    "type": "tool_progress",
+                    "message": f"Running {len(tool_calls)} action(s)...",
+                    "actions": [tc.action for tc in tool_calls]
+                }
+                tools_used, tool_results = await self._execute_tool_calls(tool_calls, user_id)
+                
+                if tool_results:
+                    assistant_message = {
+                        "role": "assistant",
+                        "content": "".join(response_parts) or None,
+                        "tool_calls": [
+                            {
+                                "id": call["id"],
+                                "type": "function",
+                                "function": {"name": call["name"], "arguments": call["arguments"]}
+                            }
+                            for call in streamed_calls.values() if call["name"]
+                        ]
+                    }
+                    follow_up_messages = self._build_follow_up_messages(messages, assistant_message, tool_results)
+                    response_parts = []
+                    async for delta in self.openai_client.chat_completion_stream(
+                        messages=follow_up_messages,
+                        model=model,
+                        max_tokens=max_tokens,
+                        prompt_cache_key=prompt_cache_key
+                    ):
+                        if delta.content:
+                            response_parts.append(delta.content)
+                            yield {"type": "token", "content": delta.content}
+            
+            gpt_response = "".join(response_parts) or "I received a response but it was empty."
+            
+            # Update user memory with this interaction
+            if not user_memory:
+                user_memory = MemoryService.create_default_memory()
+            user_memory = self._update_memory(user_memory, user_input, gpt_response, tools_used)
+            
+            response = ChatResponse(
+                response=gpt_response,
+                user_id=user_id,
+                memory_updated=True,
+                tools_used=tools_used if tools_used else None,
+                metadata=self._build_metadata(tool_calls, tool_results, context) if include_metadata else None
+            )
+            yield {"type": "done", "response": response.model_dump()}
+            
+        except Exception as e:
+            logger.error(f"Error in process_request_stream: {str(e)}")
+            raise
+    
+    def _build_metadata(
+        self, 
+        tool_calls: List[ToolCall], 
+        tool_results: List[Dict[str, Any]], 
+        context: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Build response metadata for debugging clients.
+        
+        Args:
+            tool_calls: Tool calls parsed from the response
+            tool_results: Results from executed tools
+            context: Additional context from the request
+            
+        Returns:
+            Metadata dictionary
+        """
+        return {
+            "tool_calls": [tc.model_dump() for tc in tool_calls] if tool_calls else None,
+            "tool_results": tool_results or None,
+            "context": context
+        }
+    
+    def _accumulate_tool_call_deltas(
+        self, 
+        streamed_calls: Dict[int, Dict[str, str]], 
+        tool_call_deltas: List[Any]
+    ) -> None:
+        """
+        Merge streamed tool call fragments into complete calls keyed by index.
+        
+        Args:
+            streamed_calls: Accumulated calls, updated in place
+            tool_call_deltas: Tool call fragments from a single stream chunk
+        """
+        for tc_delta in tool_call_deltas:
+            entry = streamed_calls.setdefault(tc_delta.index, {"id": "", "name": "", "arguments": ""})
+            if tc_delta.id:
+                entry["id"] = tc_delta.id
+            if tc_delta.function:
+                if tc_delta.function.name:
+                    entry["name"] += tc_delta.function.name
+                if tc_delta.function.arguments:
+                    entry["arguments"] += tc_delta.function.arguments
+    
     def _build_conversation_messages(
         self, 
         user_input: str, 
@@ -131,39 +375,34 @@ class ChatService:
         """
         messages = []
         
-        # Add system message
-        system_prompt = """You are an AI assistant with access to user memory and various tools including Todoist integration. 
-        You can help users with tasks, remember their preferences, and manage their todo lists.
-        
-        Available tools:
-        - Todoist: Add tasks, view projects, manage todos
-        - Memory: Access and update user preferences and conversation history
-        
-        When a user asks you to perform an action (like adding a task to Todoist), use the appropriate tool.
-        Always be helpful, concise, and use tools when appropriate.
-        
-        For complex operations like deleting all tasks from a project:
-        1. First use get_projects to find the project ID
-        2. Then use get_tasks with the project_id to get all tasks in that project
-        3. Finally use delete_task for each task ID found
-        
-        IMPORTANT: For bulk operations, you should execute all necessary tool calls in sequence to complete the user's request. 
-        Do not stop after just getting project information - continue with the actual deletion operations."""
-        
-        # Add user preferences context if available
+        # Add system message, with user preferences if available
+        system_prompt = SYSTEM_PROMPT_BASE
         if user_memory and user_memory.get("preferences"):
             prefs = user_memory["preferences"]
-            system_prompt += f"\n\nUser Preferences:\n- Language: {prefs.get('language', 'en')}\n- Timezone: {prefs.get('timezone', 'UTC')}"
+            system_prompt += f"\nUser preferences: language={prefs.get('language', 'en')}, timezone={prefs.get('timezone', 'UTC')}"
         
         messages.append({"role": "system", "content": system_prompt})
         
         # Add conversation history from memory
         if user_memory and user_memory.get("conversation_history"):
             history = user_memory["conversation_history"]
-            # Keep only last 5 interactions to prevent token limit issues
-            recent_history = history[-5:] if len(history) > 5 else history
+            # Keep the last few interactions verbatim; walking the deque from the right
+            # touches just those entries instead of skipping the rest
+            recent_history = list(islice(reversed(history), FULL_HISTORY_TURNS))
             
-            for interaction in recent_history:
+            # Older interactions only need their gist, which keeps the prompt short
+            older_count = len(history) - len(recent_history)
+            if older_count > 0:
+                summaries = dict.fromkeys(
+                    self._compress_interaction(interaction)
+                    for interaction in islice(history, older_count)
+                )
+                messages.append({
+                    "role": "system",
+                    "content": "Prior session summary:\n" + "\n".join(f"- {line}" for line in summaries)
+                })
+            
+            for interaction in reversed(recent_history):
                 if interaction.get("user_input"):
                     messages.append({"role": "user", "content": interaction["user_input"]})
                 if interaction.get("ai_response"):
@@ -174,118 +413,235 @@ class ChatService:
         
         return messages
     
+    def _compress_interaction(self, interaction: Dict[str, Any]) -> str:
+        """
+        Summarize an interaction as a single line for the prompt.
+        
+        Args:
+            interaction: Interaction from conversation history
+            
+        Returns:
+            One-line summary of the interaction
+        """
+        def shorten(text: Optional[str]) -> str:
+            text = " ".join((text or "").split())
+            return text if len(text) <= SUMMARY_TEXT_LIMIT else text[:SUMMARY_TEXT_LIMIT - 3] + "..."
+        
+        summary = f"User asked: {shorten(interaction.get('user_input'))}; assistant replied: {shorten(interaction.get('ai_response'))}"
+        tools_used = interaction.get("tools_used")
+        if tools_used:
+            summary += f" (tools: {', '.join(dict.fromkeys(tools_used))})"
+        return summary
+    
     def _build_follow_up_messages(
         self, 
-        original_input: str, 
-        tool_results: List[Dict[str, Any]], 
-        original_messages: List[Dict[str, str]]
-    ) -> List[Dict[str, str]]:
+        original_messages: List[Dict[str, Any]], 
+        assistant_message: Dict[str, Any], 
+        tool_results: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
         """
         Build follow-up messages after tool execution.
         
+        Continues the original conversation with the assistant's tool call
+        message and one tool message per tool call it lists, so GPT-4o answers
+        without reprocessing a rewritten prompt. Calls that were dropped before
+        execution, e.g. because their arguments were not a JSON object, are
+        answered with an error so that every tool call id gets a reply.
+        
         Args:
-            original_input: Original user input
-            tool_results: Results from executed tools
             original_messages: Original conversation messages
+            assistant_message: Assistant message containing the tool calls
+            tool_results: Results from executed tools
             
         Returns:
             List of messages for follow-up response
         """
-        # Start with original conversation
-        messages = original_messages.copy()
-        
-        # Add tool execution results
-        results_summary = "\n".join([f"- {result.get('action', 'Unknown')}: {result.get('result', 'Completed')}" 
-                                   for result in tool_results])
+        results_by_id = {result.get("tool_call_id"): result.get("result") for result in tool_results if result}
         
-        tool_message = f"""I just executed some actions for you based on your request: "{original_input}"
-
-Results:
-{results_summary}
-
-Please provide a helpful response to the user about what was accomplished."""
-        
-        messages.append({"role": "user", "content": tool_message})
+        # Answer each tool call with its result, serialized compactly to save prompt tokens
+        tool_messages = [
+            {
+                "role": "tool",
+                "tool_call_id": call["id"],
+                "content": json.dumps(
+                    results_by_id.get(call["id"], _NOT_EXECUTED_RESULT), separators=(",", ":"), default=str
+                )
+            }
+            for call in assistant_message.get("tool_calls") or []
+        ]
         
-        return messages
+        # Continue the original conversation with the assistant's tool calls and their results
+        return [*original_messages, assistant_message, *tool_messages]
     
     async def _execute_tool_calls(self, tool_calls: List[ToolCall], user_id: str) -> tuple[List[str], List[Dict[str, Any]]]:
         """
         Execute tool calls returned by GPT-4o.
         
+        Consecutive parallel-safe calls run concurrently; any other call runs on
+        its own after the calls before it have finished. Several delete_task calls
+        in one concurrent batch are fused into a single Todoist request.
+        
         Args:
             tool_calls: List of tool calls to execute
             user_id: User ID for context
             
         Returns:
-            Tuple of (executed_tools, tool_results)
+            Tuple of (executed_tools, tool_results), in tool call order
         """
-        executed_tools = []
-        tool_results = []
+        outcomes = []
+        batch = []
         
         for tool_call in tool_calls:
+            # Resolve the dispatch entry once; it is handed to _dispatch_one as-is
+            entry = self._tool_dispatch.get(tool_call.action, _UNKNOWN_TOOL)
+            if entry[2]:
+                batch.append((tool_call, entry))
+                continue
+            
+            outcomes.extend(await self._dispatch_batch(batch))
+            batch = []
+            outcomes.append(await self._dispatch_one(tool_call, entry))
+        
+        outcomes.extend(await self._dispatch_batch(batch))
+        
+        executed_tools = [tool_name for tool_name, _ in outcomes if tool_name]
+        tool_results = [result for _, result in outcomes]
+        
+        # One summary line per turn instead of one line per call
+        if executed_tools:
+            logger.info("Executed tool summary: %s", Counter(executed_tools))
+        
+        return executed_tools, tool_results
+    
+    async def _dispatch_batch(
+        self, 
+        batch: List[Tuple[ToolCall, Tuple[Optional[Callable[..., Awaitable[Any]]], Optional[str], bool]]]
+    ) -> List[tuple[Optional[str], Dict[str, Any]]]:
+        """
+        Execute parallel-safe tool calls concurrently, fusing deletes into one request.
+        
+        Args:
+            batch: Tool calls with their dispatch table entries
+            
+        Returns:
+            List of (executed tool name or None, tool result entry), in batch order
+        """
+        delete_indexes = [index for index, (tc, _) in enumerate(batch) if tc.action == "delete_task"]
+        if len(delete_indexes) < 2:
+            return list(await asyncio.gather(*[self._dispatch_one(tc, e) for tc, e in batch]))
+        
+        other_indexes = [index for index, (tc, _) in enumerate(batch) if tc.action != "delete_task"]
+        delete_outcomes, *other_outcomes = await asyncio.gather(
+            self._dispatch_deletes([batch[index][0] for index in delete_indexes]),
+            *[self._dispatch_one(*batch[index]) for index in other_indexes]
+        )
+        
+        outcomes = [None] * len(batch)
+        for index, outcome in zip(delete_indexes + other_indexes, delete_outcomes + other_outcomes):
+            outcomes[index] = outcome
+        return outcomes
+    
+    async def _dispatch_deletes(self, tool_calls: List[ToolCall]) -> List[tuple[Optional[str], Dict[str, Any]]]:
+        """
+        Execute delete_task calls with a single batched Todoist request.
+        
+        Args:
+            tool_calls: delete_task tool calls
+            
+        Returns:
+            List of (executed tool name or None, tool result entry), in call order
+        """
+        _, tool_name, _ = self._tool_dispatch["delete_task"]
+        outcomes: List[Optional[tuple[Optional[str], Dict[str, Any]]]] = [None] * len(tool_calls)
+        valid_indexes = []
+        
+        for index, tool_call in enumerate(tool_calls):
+            if "raw_args" in tool_call.args:
+                outcomes[index] = (None, self._tool_result_entry(tool_call, _NOT_EXECUTED_RESULT))
+                continue
+            
+            validation_error = self.schema_loader.validate_args(tool_call.action, tool_call.args)
+            if validation_error is not None:
+                logger.warning("Invalid arguments for %s: %s", tool_call.action, validation_error)
+                outcomes[index] = (None, self._tool_result_entry(tool_call, {"error": f"Invalid arguments: {validation_error}"}))
+            else:
+                valid_indexes.append(index)
+        
+        if valid_indexes:
             try:
-                result = None
-                
-                if tool_call.action == "add_task":
-                    # Execute Todoist task creation
-                    result = await self.todoist_service.add_task(**tool_call.args)
-                    executed_tools.append("todoist_add_task")
-                    logger.info(f"Added Todoist task: {result}")
-                    
-                elif tool_call.action == "get_projects":
-                    # Get Todoist projects
-                    result = await self.todoist_service.get_projects()
-                    executed_tools.append("todoist_get_projects")
-                    logger.info(f"Retrieved Todoist projects: {result}")
-                    
-                elif tool_call.action == "get_tasks":
-                    # Get Todoist tasks
-                    result = await self.todoist_service.get_tasks(**tool_call.args)
-                    executed_tools.append("todoist_get_tasks")
-                    logger.info(f"Retrieved Todoist tasks: {result}")
-                    
-                elif tool_call.action == "complete_task":
-                    # Complete a Todoist task
-                    result = await self.todoist_service.close_task(**tool_call.args)
-                    executed_tools.append("todoist_complete_task")
-                    logger.info(f"Completed Todoist task: {result}")
-                    
-                elif tool_call.action == "delete_task":
-                    # Delete a Todoist task
-                    result = await self.todoist_service.delete_task(**tool_call.args)
-                    executed_tools.append("todoist_delete_task")
-                    logger.info(f"Deleted Todoist task: {result}")
-                    
-                elif tool_call.action == "update_task":
-                    # Update a Todoist task
-                    result = await self.todoist_service.update_task(**tool_call.args)
-                    executed_tools.append("todoist_update_task")
-                    logger.info(f"Updated Todoist task: {result}")
-                    
-                else:
-                    logger.warning(f"Unknown tool call: {tool_call.action}")
-                    result = {"error": f"Unknown action: {tool_call.action}"}
-                
-                # Add result to tool_results
-                if result is not None:
-                    tool_results.append({
-                        "action": tool_call.action,
-                        "args": tool_call.args,
-                        "result": result,
-                        "success": "error" not in str(result).lower()
-                    })
+                results = await self.todoist_service.batch_delete_tasks(
+                    [tool_calls[index].args.get("task_id") for index in valid_indexes]
+                )
+                for index, result in zip(valid_indexes, results):
+                    outcomes[index] = (tool_name, self._tool_result_entry(tool_calls[index], result))
                     
             except Exception as e:
-                logger.error(f"Error executing tool call {tool_call.action}: {str(e)}")
-                tool_results.append({
-                    "action": tool_call.action,
-                    "args": tool_call.args,
-                    "result": {"error": str(e)},
-                    "success": False
-                })
+                logger.error("Error executing batched delete_task calls: %s", e)
+                for index in valid_indexes:
+                    outcomes[index] = (None, self._tool_result_entry(tool_calls[index], {"error": str(e)}))
         
-        return executed_tools, tool_results
+        return outcomes
+    
+    def _tool_result_entry(self, tool_call: ToolCall, result: Any) -> Dict[str, Any]:
+        """
+        Build the result entry reported for a tool call.
+        
+        Args:
+            tool_call: Tool call that was executed
+            result: Result returned by the tool, or an error dictionary
+            
+        Returns:
+            Tool result entry
+        """
+        return {
+            "tool_call_id": tool_call.tool_call_id,
+            "action": tool_call.action,
+            "args": tool_call.args,
+            "result": result,
+            "success": "error" not in str(result).lower()
+        }
+    
+    async def _dispatch_one(
+        self, 
+        tool_call: ToolCall, 
+        entry: Tuple[Optional[Callable[..., Awaitable[Any]]], Optional[str], bool]
+    ) -> tuple[Optional[str], Dict[str, Any]]:
+        """
+        Execute a single tool call.
+        
+        Args:
+            tool_call: Tool call to execute
+            entry: Dispatch table entry for the call's action
+            
+        Returns:
+            Tuple of (executed tool name or None, tool result entry)
+        """
+        try:
+            handler, tool_name, _ = entry
+            if handler is None:
+                logger.warning("Unknown tool call: %s", tool_call.action)
+                result = {"error": f"Unknown action: {tool_call.action}"}
+            elif "raw_args" in tool_call.args:
+                # The parser keeps arguments that were not a JSON object as a raw string
+                logger.warning("Unparseable arguments for %s, not executing", tool_call.action)
+                tool_name = None
+                result = _NOT_EXECUTED_RESULT
+            else:
+                # Reject malformed arguments before they cost a Todoist round-trip
+                validation_error = self.schema_loader.validate_args(tool_call.action, tool_call.args)
+                if validation_error is not None:
+                    logger.warning("Invalid arguments for %s: %s", tool_call.action, validation_error)
+                    tool_name = None
+                    result = {"error": f"Invalid arguments: {validation_error}"}
+                else:
+                    result = await handler(**tool_call.args)
+                    logger.debug("Executed %s: %s", tool_name, result)
+            
+            return tool_name, self._tool_result_entry(tool_call, result)
+            
+        except Exception as e:
+            logger.error("Error executing tool call %s: %s", tool_call.action, e)
+            return None, self._tool_result_entry(tool_call, {"error": str(e)})
     
     def _update_memory(
         self, 
@@ -293,40 +649,32 @@ Please provide a helpful response to the user about what was accomplished."""
         user_input: str, 
         ai_response: str, 
         tools_used: List[str]
-    ) -> bool:
+    ) -> Dict[str, Any]:
         """
-        Update user memory with the current interaction.
+        Update user memory in place with the current interaction.
         
         Args:
-            user_memory: Current user memory
+            user_memory: Current user memory, as created by MemoryService
             user_input: User's message
             ai_response: AI's response
             tools_used: Tools that were used
             
         Returns:
-            True if memory was updated, False otherwise
-        """
-        # Initialize memory if empty
-        if not user_memory:
-            user_memory = {
-                "conversation_history": [],
-                "preferences": {},
-                "last_interaction": None
-            }
-        
+            The updated user memory
+        """
         # Add current interaction to history
         interaction = {
             "user_input": user_input,
             "ai_response": ai_response,
             "tools_used": tools_used,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": time.time_ns()
         }
         
+        # History is a bounded deque, so appending drops the oldest interaction
         user_memory["conversation_history"].append(interaction)
         user_memory["last_interaction"] = interaction
         
-        # Keep only last 10 interactions to prevent memory bloat
-        if len(user_memory["conversation_history"]) > 10:
-            user_memory["conversation_history"] = user_memory["conversation_history"][-10:]
+        # Lifetime counter; the history deque only keeps the last services.memory.HISTORY_LIMIT interactions
+        user_memory["interaction_count"] = user_memory.get("interaction_count", 0) + 1
         
-        return True 
\ No newline at end of file
+        return user_memory 
\ No newline at end of file
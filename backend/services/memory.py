@@ -1,15 +1,65 @@
 """
-Memory service for loading and saving user-specific memory as JSON.
+Memory service for loading and saving user-specific memory in SQLite.
 """
 
-import json
 import os
+import sqlite3
+import asyncio
 import logging
-from typing import Dict, Any, Optional
+import threading
+import orjson
+from collections import deque
+from cachetools import LRUCache
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Set
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Number of interactions kept in conversation_history
+HISTORY_LIMIT = 10
+
+# Number of users whose memory is kept in process
+MEMORY_CACHE_SIZE = 1024
+
+# Top-level memory keys stored in dedicated columns; anything else goes to users.extra
+_USER_COLUMNS = ("preferences", "todoist_integration", "created_at", "last_updated", "interaction_count")
+_DERIVED_KEYS = {"user_id", "conversation_history", "last_interaction"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id TEXT PRIMARY KEY,
+    preferences TEXT,
+    todoist_integration TEXT,
+    created_at TEXT,
+    last_updated TEXT,
+    interaction_count INTEGER NOT NULL DEFAULT 0,
+    extra TEXT
+);
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    ts INTEGER,
+    user_input TEXT,
+    ai_response TEXT,
+    tools_used TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_history_user ON history (user_id, id DESC);
+"""
+
+def _dumps(value: Any) -> str:
+    """Serialize a value to compact JSON text for a database column."""
+    return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+
+def _parse_timestamp(value: Any) -> Any:
+    """Convert a stored timestamp to epoch nanoseconds, accepting legacy ISO strings."""
+    if isinstance(value, str):
+        try:
+            return int(value) if value.isdigit() else int(datetime.fromisoformat(value).timestamp() * 1_000_000_000)
+        except ValueError:
+            return value
+    return value
+
 class MemoryService:
     """Service for managing user memory persistence."""
     
@@ -18,40 +68,137 @@ class MemoryService:
         Initialize the memory service.
         
         Args:
-            data_dir: Directory to store memory files
+            data_dir: Directory to store the memory database
         """
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(exist_ok=True)
+        
+        # WAL gives crash safety without rewriting whole files, and lets reads run alongside writes
+        self._conn = sqlite3.connect(
+            self.data_dir / "memory.db", isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._db_lock = threading.Lock()
+        
+        # In-memory copy of recently active users' memory; the database is written behind it.
+        # Memory not yet written is also held in _unflushed so LRU eviction cannot lose it.
+        self._cache: LRUCache = LRUCache(maxsize=MEMORY_CACHE_SIZE)
+        self._unflushed: Dict[str, Dict[str, Any]] = {}
+        self._dirty: Set[str] = set()
+        self._flush_tasks: Dict[str, asyncio.Task] = {}
+        
+        # Last interaction already stored per user, so a flush only inserts newer ones
+        self._last_persisted: Dict[str, Optional[Dict[str, Any]]] = {}
+        
+        # Legacy JSON files imported but not yet written to the database
+        self._legacy_files: Dict[str, Path] = {}
     
     def load_memory(self, user_id: str) -> Dict[str, Any]:
         """
-        Load user memory from JSON file.
+        Load user memory, reading the database only on first access.
         
         Args:
             user_id: Unique user identifier
             
         Returns:
-            User memory dictionary, empty dict if no memory exists
+            User memory dictionary, default memory if no memory exists
+        """
+        memory = self._cache.get(user_id)
+        if memory is None:
+            memory = self._unflushed.get(user_id)
+            if memory is None:
+                memory = self._load_from_db(user_id)
+            self._cache[user_id] = memory
+        return memory
+    
+    def _load_from_db(self, user_id: str) -> Dict[str, Any]:
+        """
+        Load user memory from the database, importing a legacy JSON file if present.
+        
+        Args:
+            user_id: Unique user identifier
+            
+        Returns:
+            User memory dictionary, default memory if no memory exists
         """
         try:
-            memory_file = self.data_dir / f"memory_{user_id}.json"
+            with self._db_lock:
+                user_row = self._conn.execute(
+                    "SELECT preferences, todoist_integration, created_at, last_updated, interaction_count, extra "
+                    "FROM users WHERE user_id = ?",
+                    (user_id,)
+                ).fetchone()
+                history_rows = self._conn.execute(
+                    "SELECT ts, user_input, ai_response, tools_used FROM history "
+                    "WHERE user_id = ? ORDER BY id DESC LIMIT ?",
+                    (user_id, HISTORY_LIMIT)
+                ).fetchall()
+                
+            if user_row is None:
+                return self._load_legacy_file(user_id)
+                
+            preferences, todoist_integration, created_at, last_updated, interaction_count, extra = user_row
+            memory = orjson.loads(extra) if extra else {}
+            memory.update({
+                "user_id": user_id,
+                "preferences": orjson.loads(preferences) if preferences else {},
+                "todoist_integration": orjson.loads(todoist_integration) if todoist_integration else {},
+                "created_at": created_at,
+                "last_updated": last_updated,
+                "interaction_count": interaction_count
+            })
             
-            if not memory_file.exists():
-                logger.info(f"No memory file found for user {user_id}, creating new memory")
-                return self._create_default_memory()
+            history = deque(maxlen=HISTORY_LIMIT)
+            for ts, user_input, ai_response, tools_used in reversed(history_rows):
+                history.append({
+                    "user_input": user_input,
+                    "ai_response": ai_response,
+                    "tools_used": orjson.loads(tools_used) if tools_used else [],
+                    "timestamp": _parse_timestamp(ts)
+                })
+            memory["conversation_history"] = history
+            memory["last_interaction"] = history[-1] if history else None
+            
+            self._last_persisted[user_id] = memory["last_interaction"]
+            logger.info(f"Loaded memory for user {user_id}")
+            return memory
             
-            with open(memory_file, 'r', encoding='utf-8') as f:
-                memory = json.load(f)
-                logger.info(f"Loaded memory for user {user_id}")
-                return memory
-                
         except Exception as e:
             logger.error(f"Error loading memory for user {user_id}: {str(e)}")
-            return self._create_default_memory()
+            return self.create_default_memory()
     
-    def save_memory(self, user_id: str, memory: Dict[str, Any]) -> bool:
+    def _load_legacy_file(self, user_id: str) -> Dict[str, Any]:
         """
-        Save user memory to JSON file.
+        Load memory from a pre-database JSON file; it is written to the database on next save.
+        
+        Args:
+            user_id: Unique user identifier
+            
+        Returns:
+            User memory dictionary, default memory if no legacy file exists
+        """
+        memory_file = self.data_dir / f"memory_{user_id}.json"
+        
+        if not memory_file.exists():
+            logger.info(f"No memory found for user {user_id}, creating new memory")
+            return self.create_default_memory()
+            
+        memory = orjson.loads(memory_file.read_bytes())
+        memory["conversation_history"] = deque(
+            memory.get("conversation_history", []), maxlen=HISTORY_LIMIT
+        )
+        
+        # Nothing from the file is in the database yet
+        self._last_persisted[user_id] = None
+        self._legacy_files[user_id] = memory_file
+        logger.info(f"Loaded legacy memory file for user {user_id}")
+        return memory
+    
+    async def save_memory(self, user_id: str, memory: Dict[str, Any]) -> bool:
+        """
+        Save user memory to the in-memory cache and schedule a database write.
         
         Args:
             user_id: Unique user identifier
@@ -61,25 +208,165 @@ class MemoryService:
             True if successful, False otherwise
         """
         try:
-            memory_file = self.data_dir / f"memory_{user_id}.json"
-            
-            # Create backup of existing file
-            if memory_file.exists():
-                backup_file = self.data_dir / f"memory_{user_id}.json.backup"
-                memory_file.rename(backup_file)
-            
-            # Save new memory
-            with open(memory_file, 'w', encoding='utf-8') as f:
-                json.dump(memory, f, indent=2, ensure_ascii=False)
+            self._cache[user_id] = memory
+            self._unflushed[user_id] = memory
+            self._dirty.add(user_id)
             
-            logger.info(f"Saved memory for user {user_id}")
+            # One flush task per user; it keeps writing until no changes are pending
+            if user_id not in self._flush_tasks:
+                self._flush_tasks[user_id] = asyncio.create_task(self._flush(user_id))
+                
             return True
             
         except Exception as e:
             logger.error(f"Error saving memory for user {user_id}: {str(e)}")
             return False
     
-    def update_memory(self, user_id: str, updates: Dict[str, Any]) -> bool:
+    async def flush_all(self):
+        """Wait for all pending memory writes to reach the database."""
+        pending = list(self._flush_tasks.values())
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+    
+    def close(self):
+        """Close the database connection."""
+        with self._db_lock:
+            self._conn.close()
+    
+    async def _flush(self, user_id: str):
+        """
+        Write a user's cached memory to the database until no changes are pending.
+        
+        Args:
+            user_id: Unique user identifier
+        """
+        try:
+            while user_id in self._dirty:
+                self._dirty.discard(user_id)
+                memory = self._unflushed.get(user_id)
+                if memory is None:
+                    break
+                    
+                # Serialize on the event loop so the dict is not mutated mid-dump
+                new_interactions = self._unpersisted_interactions(user_id, memory)
+                user_values = self._serialize_user(user_id, memory)
+                history_values = [
+                    (
+                        user_id,
+                        interaction.get("timestamp"),
+                        interaction.get("user_input"),
+                        interaction.get("ai_response"),
+                        _dumps(interaction.get("tools_used") or [])
+                    )
+                    for interaction in new_interactions
+                ]
+                
+                await asyncio.to_thread(self._write_to_db, user_values, history_values)
+                if new_interactions:
+                    self._last_persisted[user_id] = new_interactions[-1]
+                    
+                legacy_file = self._legacy_files.pop(user_id, None)
+                if legacy_file is not None:
+                    self._retire_legacy_file(legacy_file)
+                    
+            # Everything is in the database now, so the cache may evict this user
+            self._unflushed.pop(user_id, None)
+            
+        except Exception as e:
+            logger.error(f"Error saving memory for user {user_id}: {str(e)}")
+        finally:
+            self._flush_tasks.pop(user_id, None)
+    
+    def _retire_legacy_file(self, memory_file: Path):
+        """
+        Rename an imported legacy JSON file so it is not imported again.
+        
+        Args:
+            memory_file: Legacy memory file now stored in the database
+        """
+        try:
+            # A single atomic rename; the file is kept as a backup of the import
+            os.replace(memory_file, memory_file.with_suffix(".json.imported"))
+        except OSError as e:
+            logger.warning(f"Could not retire legacy memory file {memory_file.name}: {str(e)}")
+    
+    def _unpersisted_interactions(self, user_id: str, memory: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Get the interactions appended since the last successful write.
+        
+        Args:
+            user_id: Unique user identifier
+            memory: User memory dictionary
+            
+        Returns:
+            Interactions not yet stored in the database, oldest first
+        """
+        history = list(memory.get("conversation_history", []))
+        last_persisted = self._last_persisted.get(user_id)
+        
+        for index in range(len(history) - 1, -1, -1):
+            if history[index] is last_persisted:
+                return history[index + 1:]
+        return history
+    
+    def _serialize_user(self, user_id: str, memory: Dict[str, Any]) -> tuple:
+        """
+        Build the users row for a memory dictionary.
+        
+        Args:
+            user_id: Unique user identifier
+            memory: User memory dictionary
+            
+        Returns:
+            Column values for the users table
+        """
+        extra = {
+            key: value for key, value in memory.items()
+            if key not in _USER_COLUMNS and key not in _DERIVED_KEYS
+        }
+        return (
+            user_id,
+            _dumps(memory.get("preferences", {})),
+            _dumps(memory.get("todoist_integration", {})),
+            memory.get("created_at"),
+            memory.get("last_updated"),
+            memory.get("interaction_count", 0),
+            _dumps(extra)
+        )
+    
+    def _write_to_db(self, user_values: tuple, history_values: List[tuple]):
+        """
+        Upsert the user row and append new interactions in one transaction.
+        
+        Args:
+            user_values: Column values for the users table
+            history_values: Rows to insert into the history table
+        """
+        with self._db_lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(
+                    "INSERT INTO users (user_id, preferences, todoist_integration, created_at, "
+                    "last_updated, interaction_count, extra) VALUES (?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(user_id) DO UPDATE SET preferences = excluded.preferences, "
+                    "todoist_integration = excluded.todoist_integration, created_at = excluded.created_at, "
+                    "last_updated = excluded.last_updated, interaction_count = excluded.interaction_count, "
+                    "extra = excluded.extra",
+                    user_values
+                )
+                self._conn.executemany(
+                    "INSERT INTO history (user_id, ts, user_input, ai_response, tools_used) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    history_values
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+                
+        logger.info(f"Saved memory for user {user_values[0]}")
+    
+    async def update_memory(self, user_id: str, updates: Dict[str, Any]) -> bool:
         """
         Update specific parts of user memory.
         
@@ -93,7 +380,7 @@ class MemoryService:
         try:
             memory = self.load_memory(user_id)
             memory.update(updates)
-            return self.save_memory(user_id, memory)
+            return await self.save_memory(user_id, memory)
             
         except Exception as e:
             logger.error(f"Error updating memory for user {user_id}: {str(e)}")
@@ -101,7 +388,7 @@ class MemoryService:
     
     def delete_memory(self, user_id: str) -> bool:
         """
-        Delete user memory file.
+        Delete user memory.
         
         Args:
             user_id: Unique user identifier
@@ -110,21 +397,35 @@ class MemoryService:
             True if successful, False otherwise
         """
         try:
-            memory_file = self.data_dir / f"memory_{user_id}.json"
+            self._cache.pop(user_id, None)
+            self._unflushed.pop(user_id, None)
+            self._dirty.discard(user_id)
+            self._last_persisted.pop(user_id, None)
+            self._legacy_files.pop(user_id, None)
             
-            if memory_file.exists():
-                memory_file.unlink()
+            with self._db_lock:
+                self._conn.execute("DELETE FROM history WHERE user_id = ?", (user_id,))
+                deleted = self._conn.execute("DELETE FROM users WHERE user_id = ?", (user_id,)).rowcount
+                
+            # A legacy file that was never imported would otherwise bring the memory back
+            legacy_file = self.data_dir / f"memory_{user_id}.json"
+            if legacy_file.exists():
+                legacy_file.unlink()
+                deleted = True
+                
+            if deleted:
                 logger.info(f"Deleted memory for user {user_id}")
                 return True
             else:
-                logger.warning(f"No memory file found for user {user_id}")
+                logger.warning(f"No memory found for user {user_id}")
                 return False
                 
         except Exception as e:
             logger.error(f"Error deleting memory for user {user_id}: {str(e)}")
             return False
     
-    def _create_default_memory(self) -> Dict[str, Any]:
+    @staticmethod
+    def create_default_memory() -> Dict[str, Any]:
         """
         Create a default memory structure for new users.
         
@@ -133,7 +434,7 @@ class MemoryService:
         """
         return {
             "user_id": None,
-            "conversation_history": [],
+            "conversation_history": deque(maxlen=HISTORY_LIMIT),
             "preferences": {
                 "language": "en",
                 "timezone": "UTC",
@@ -161,14 +462,23 @@ class MemoryService:
         """
         try:
             memory = self.load_memory(user_id)
-            memory_file = self.data_dir / f"memory_{user_id}.json"
             
+            with self._db_lock:
+                memory_exists = self._conn.execute(
+                    "SELECT 1 FROM users WHERE user_id = ?", (user_id,)
+                ).fetchone() is not None
+                stored_interactions = self._conn.execute(
+                    "SELECT COUNT(*) FROM history WHERE user_id = ?", (user_id,)
+                ).fetchone()[0]
+                
             stats = {
                 "user_id": user_id,
-                "memory_exists": memory_file.exists(),
-                "file_size_bytes": memory_file.stat().st_size if memory_file.exists() else 0,
-                "conversation_count": len(memory.get("conversation_history", [])),
+                "memory_exists": memory_exists,
+                "stored_interactions": stored_interactions,
+                # Retained window only; lifetime_interactions counts every interaction
+                "conversation_count": len(memory["conversation_history"]),
                 "interaction_count": memory.get("interaction_count", 0),
+                "lifetime_interactions": memory.get("interaction_count", 0),
                 "preferences_count": len(memory.get("preferences", {})),
                 "last_updated": memory.get("last_updated", "Unknown")
             }
@@ -177,4 +487,4 @@ class MemoryService:
             
         except Exception as e:
             logger.error(f"Error getting memory stats for user {user_id}: {str(e)}")
-            return {"user_id": user_id, "error": str(e)} 
\ No newline at end of file
+            return {"user_id": user_id, "error": str(e)}
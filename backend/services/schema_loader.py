@@ -3,13 +3,178 @@ Schema loader for MCP action schemas.
 Loads tool schemas from local JSON files for GPT-4o function calling.
 """
 
-import json
+import os
+import mmap
 import logging
-from typing import Dict, Any, List, Optional
+import orjson
+import fastjsonschema
+from typing import Dict, Any, List, Optional, Callable, Tuple
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on threads reading schema files concurrently
+SCHEMA_LOAD_WORKERS = 8
+
+# Schema files at least this large are memory-mapped instead of read into a buffer
+SCHEMA_MMAP_THRESHOLD = 64 * 1024
+
+# Built-in tool schemas, shared by every loader and written out as default schema files
+_TODOIST_SCHEMAS = (
+    {
+        "type": "function",
+        "function": {
+            "name": "add_task",
+            "description": "Add a new task to Todoist",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "content": {
+                        "type": "string",
+                        "description": "The content/description of the task"
+                    },
+                    "project_id": {
+                        "type": "string",
+                        "description": "Optional project ID to add the task to"
+                    },
+                    "due_date": {
+                        "type": "string",
+                        "description": "Optional due date in ISO format (YYYY-MM-DD)"
+                    },
+                    "priority": {
+                        "type": "integer",
+                        "description": "Task priority (1-4, where 1 is highest)",
+                        "minimum": 1,
+                        "maximum": 4
+                    },
+                    "description": {
+                        "type": "string",
+                        "description": "Optional detailed description of the task"
+                    },
+                    "labels": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Optional list of label names to apply"
+                    }
+                },
+                "required": ["content"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_projects",
+            "description": "Get all Todoist projects",
+            "parameters": {
+                "type": "object",
+                "properties": {},
+                "required": []
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_tasks",
+            "description": "Get tasks from Todoist, optionally filtered by project",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "project_id": {
+                        "type": "string",
+                        "description": "Optional project ID to filter tasks"
+                    }
+                },
+                "required": []
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "complete_task",
+            "description": "Mark a Todoist task as completed",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "task_id": {
+                        "type": "string",
+                        "description": "The ID of the task to complete"
+                    }
+                },
+                "required": ["task_id"]
+            }
+        }
+    }
+)
+
+_MEMORY_SCHEMAS = (
+    {
+        "type": "function",
+        "function": {
+            "name": "update_preference",
+            "description": "Update a user preference in memory",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "key": {
+                        "type": "string",
+                        "description": "The preference key to update"
+                    },
+                    "value": {
+                        "type": "string",
+                        "description": "The new value for the preference"
+                    }
+                },
+                "required": ["key", "value"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_preference",
+            "description": "Get a user preference from memory",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "key": {
+                        "type": "string",
+                        "description": "The preference key to retrieve"
+                    }
+                },
+                "required": ["key"]
+            }
+        }
+    }
+)
+
+_DEFAULT_SCHEMA_FILES = {
+    "todoist.json": _TODOIST_SCHEMAS,
+    "memory.json": _MEMORY_SCHEMAS
+}
+
+# Structure every tool schema must have, compiled once into a validator
+_TOOL_SCHEMA_META = {
+    "type": "object",
+    "required": ["type", "function"],
+    "properties": {
+        "type": {"const": "function"},
+        "function": {
+            "type": "object",
+            "required": ["name", "description"],
+            "properties": {
+                "name": {"type": "string"},
+                "description": {"type": "string"}
+            }
+        }
+    }
+}
+_validate_tool_schema = fastjsonschema.compile(_TOOL_SCHEMA_META)
+
 class SchemaLoader:
     """Service for loading MCP action schemas from local JSON files."""
     
@@ -23,36 +188,86 @@ class SchemaLoader:
         self.schemas_dir = Path(schemas_dir)
         self.schemas_dir.mkdir(exist_ok=True)
         self._schemas_cache = {}
+        self._schemas_by_name: Dict[str, Dict[str, Any]] = {}
+        self._validators: Dict[str, Callable[[Any], Any]] = {}
+        self._dir_mtime: Optional[Tuple[int, int]] = None
         self._load_default_schemas()
     
     def get_available_schemas(self) -> List[Dict[str, Any]]:
         """
         Get all available tool schemas for GPT-4o function calling.
         
+        The result is cached and only rebuilt when the schemas directory changes; a
+        rebuild that hits a broken schema file keeps serving the previous schemas.
+        
         Returns:
             List of tool schemas in OpenAI format
         """
         try:
-            schemas = []
-            
-            # Add Todoist schemas
-            todoist_schemas = self._get_todoist_schemas()
-            schemas.extend(todoist_schemas)
-            
-            # Add memory schemas
-            memory_schemas = self._get_memory_schemas()
-            schemas.extend(memory_schemas)
+            dir_mtime = self._get_dir_mtime()
+            cached = self._schemas_cache.get("all")
+            if cached is not None and dir_mtime == self._dir_mtime:
+                return cached
             
-            # Load custom schemas from files
-            custom_schemas = self._load_custom_schemas()
-            schemas.extend(custom_schemas)
-            
-            logger.info(f"Loaded {len(schemas)} tool schemas")
-            return schemas
+            # The first load skips broken files so startup still gets every good tool;
+            # once a set is loaded, a broken file keeps it instead of dropping tools
+            return self._build_schemas(dir_mtime, strict=cached is not None)
             
         except Exception as e:
-            logger.error(f"Error loading schemas: {str(e)}")
-            return []
+            logger.error("Error loading schemas: %s", e)
+            # Keep serving the last good schemas rather than dropping every tool
+            return self._schemas_cache.get("all", [])
+    
+    def _build_schemas(self, dir_mtime: Tuple[int, int], strict: bool = False) -> List[Dict[str, Any]]:
+        """
+        Rebuild the schema list, index, validators and caches, raising on any error.
+        
+        Args:
+            dir_mtime: Schemas directory fingerprint the rebuilt cache belongs to
+            strict: Also raise when a single schema file or parameter schema is broken,
+                instead of skipping it
+            
+        Returns:
+            List of tool schemas in OpenAI format
+        """
+        # The default schema files repeat the built-ins, so key every schema by
+        # tool name: later definitions replace earlier ones in place, letting
+        # schema files win over built-ins without sending any tool twice
+        schemas_by_name = {}
+        
+        # Add Todoist schemas
+        for schema in self._get_todoist_schemas():
+            schemas_by_name[schema.get("function", {}).get("name")] = schema
+        
+        # Add memory schemas
+        for schema in self._get_memory_schemas():
+            schemas_by_name[schema.get("function", {}).get("name")] = schema
+        
+        # Load custom schemas from files
+        for schema in self._load_custom_schemas(strict):
+            schemas_by_name[schema.get("function", {}).get("name")] = schema
+        
+        schemas = list(schemas_by_name.values())
+        self._compile_validators(schemas, strict)
+        
+        self._schemas_by_name = schemas_by_name
+        self._schemas_cache["all"] = schemas
+        # Serialized once per rebuild so callers that need JSON never re-encode the list
+        self._schemas_cache["all_bytes"] = orjson.dumps(schemas)
+        self._dir_mtime = dir_mtime
+        
+        logger.info("Loaded %s tool schemas", len(schemas))
+        return schemas
+    
+    def get_available_schemas_bytes(self) -> bytes:
+        """
+        Get all available tool schemas serialized as a JSON array.
+        
+        Returns:
+            UTF-8 JSON bytes of the list returned by get_available_schemas
+        """
+        self.get_available_schemas()
+        return self._schemas_cache.get("all_bytes", b"[]")
     
     def get_schema_by_name(self, schema_name: str) -> Optional[Dict[str, Any]]:
         """
@@ -64,11 +279,81 @@ class SchemaLoader:
         Returns:
             Schema dictionary or None if not found
         """
-        schemas = self.get_available_schemas()
+        # The index is built with the schema list and dropped by reload_schemas,
+        # so a lookup only touches the disk when nothing has been loaded yet
+        if not self._schemas_by_name:
+            self.get_available_schemas()
+        return self._schemas_by_name.get(schema_name)
+    
+    def _get_dir_mtime(self) -> Tuple[int, int]:
+        """
+        Fingerprint the schemas directory by modification times.
+        
+        The directory mtime changes when files are added, removed or renamed;
+        the newest file mtime changes when a schema file is edited.
+        
+        Returns:
+            Tuple of (directory mtime, newest schema file mtime) in nanoseconds
+        """
+        file_mtimes = [entry.stat().st_mtime_ns for entry in self._scan_schema_files()]
+        return self.schemas_dir.stat().st_mtime_ns, max(file_mtimes, default=0)
+    
+    def _scan_schema_files(self) -> List[os.DirEntry]:
+        """
+        List the JSON schema files in the schemas directory with a single scandir pass.
+        
+        Returns:
+            Directory entries for schema files, sorted by name
+        """
+        with os.scandir(self.schemas_dir) as entries:
+            schema_files = [entry for entry in entries if entry.name.endswith(".json") and entry.is_file()]
+        return sorted(schema_files, key=lambda entry: entry.name)
+    
+    def validate_args(self, action: str, args: Dict[str, Any]) -> Optional[str]:
+        """
+        Validate tool call arguments against the action's parameter schema.
+        
+        Args:
+            action: Name of the tool action
+            args: Arguments from the tool call
+            
+        Returns:
+            Validation error message, or None if the arguments are valid or the action has no schema
+        """
+        validator = self._validators.get(action)
+        if validator is None:
+            return None
+        
+        try:
+            validator(args)
+            return None
+        except fastjsonschema.JsonSchemaException as e:
+            return e.message
+    
+    def _compile_validators(self, schemas: List[Dict[str, Any]], strict: bool = False):
+        """
+        Compile a validator for each schema's parameters.
+        
+        Args:
+            schemas: Tool schemas in OpenAI format
+            strict: Raise on an invalid parameter schema instead of skipping its validator
+        """
+        validators = {}
         for schema in schemas:
-            if schema.get("function", {}).get("name") == schema_name:
-                return schema
-        return None
+            function = schema.get("function", {})
+            name = function.get("name")
+            parameters = function.get("parameters")
+            if not name or not parameters:
+                continue
+            
+            try:
+                validators[name] = fastjsonschema.compile(parameters)
+            except fastjsonschema.JsonSchemaDefinitionException as e:
+                if strict:
+                    raise
+                logger.error("Invalid parameter schema for %s: %s", name, e)
+        
+        self._validators = validators
     
     def _get_todoist_schemas(self) -> List[Dict[str, Any]]:
         """
@@ -77,94 +362,7 @@ class SchemaLoader:
         Returns:
             List of Todoist tool schemas
         """
-        return [
-            {
-                "type": "function",
-                "function": {
-                    "name": "add_task",
-                    "description": "Add a new task to Todoist",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "content": {
-                                "type": "string",
-                                "description": "The content/description of the task"
-                            },
-                            "project_id": {
-                                "type": "string",
-                                "description": "Optional project ID to add the task to"
-                            },
-                            "due_date": {
-                                "type": "string",
-                                "description": "Optional due date in ISO format (YYYY-MM-DD)"
-                            },
-                            "priority": {
-                                "type": "integer",
-                                "description": "Task priority (1-4, where 1 is highest)",
-                                "minimum": 1,
-                                "maximum": 4
-                            },
-                            "description": {
-                                "type": "string",
-                                "description": "Optional detailed description of the task"
-                            },
-                            "labels": {
-                                "type": "array",
-                                "items": {"type": "string"},
-                                "description": "Optional list of label names to apply"
-                            }
-                        },
-                        "required": ["content"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_projects",
-                    "description": "Get all Todoist projects",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {},
-                        "required": []
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_tasks",
-                    "description": "Get tasks from Todoist, optionally filtered by project",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "project_id": {
-                                "type": "string",
-                                "description": "Optional project ID to filter tasks"
-                            }
-                        },
-                        "required": []
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "complete_task",
-                    "description": "Mark a Todoist task as completed",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "task_id": {
-                                "type": "string",
-                                "description": "The ID of the task to complete"
-                            }
-                        },
-                        "required": ["task_id"]
-                    }
-                }
-            }
-        ]
+        return list(_TODOIST_SCHEMAS)
     
     def _get_memory_schemas(self) -> List[Dict[str, Any]]:
         """
@@ -173,78 +371,71 @@ class SchemaLoader:
         Returns:
             List of memory tool schemas
         """
-        return [
-            {
-                "type": "function",
-                "function": {
-                    "name": "update_preference",
-                    "description": "Update a user preference in memory",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "key": {
-                                "type": "string",
-                                "description": "The preference key to update"
-                            },
-                            "value": {
-                                "type": "string",
-                                "description": "The new value for the preference"
-                            }
-                        },
-                        "required": ["key", "value"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_preference",
-                    "description": "Get a user preference from memory",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "key": {
-                                "type": "string",
-                                "description": "The preference key to retrieve"
-                            }
-                        },
-                        "required": ["key"]
-                    }
-                }
-            }
-        ]
+        return list(_MEMORY_SCHEMAS)
     
-    def _load_custom_schemas(self) -> List[Dict[str, Any]]:
+    def _load_custom_schemas(self, strict: bool = False) -> List[Dict[str, Any]]:
         """
         Load custom schemas from JSON files in the schemas directory.
         
+        Args:
+            strict: Raise on the first file that cannot be read or parsed instead of skipping it
+            
         Returns:
             List of custom tool schemas
         """
         schemas = []
         
         try:
-            for schema_file in self.schemas_dir.glob("*.json"):
-                try:
-                    with open(schema_file, 'r', encoding='utf-8') as f:
-                        schema_data = json.load(f)
-                        
-                        # Handle both single schema and array of schemas
-                        if isinstance(schema_data, list):
-                            schemas.extend(schema_data)
-                        else:
-                            schemas.append(schema_data)
-                            
-                    logger.info(f"Loaded custom schema from {schema_file}")
-                    
-                except Exception as e:
-                    logger.error(f"Error loading schema from {schema_file}: {str(e)}")
+            schema_paths = [entry.path for entry in self._scan_schema_files()]
+            if not schema_paths:
+                return schemas
+            
+            # Reads and orjson parsing release the GIL, so files load concurrently
+            with ThreadPoolExecutor(max_workers=min(SCHEMA_LOAD_WORKERS, len(schema_paths))) as executor:
+                loaded = executor.map(partial(self._read_schema_file, strict=strict), schema_paths)
+                
+                for schema_data in loaded:
+                    # Handle both single schema and array of schemas
+                    if isinstance(schema_data, list):
+                        schemas.extend(schema_data)
+                    elif schema_data is not None:
+                        schemas.append(schema_data)
                     
         except Exception as e:
-            logger.error(f"Error scanning schemas directory: {str(e)}")
+            if strict:
+                raise
+            logger.error("Error scanning schemas directory: %s", e)
         
         return schemas
     
+    def _read_schema_file(self, schema_path: str, strict: bool = False) -> Optional[Any]:
+        """
+        Read and parse a single schema file.
+        
+        Args:
+            schema_path: Path to the schema JSON file
+            strict: Raise instead of returning None when the file cannot be loaded
+            
+        Returns:
+            Parsed schema data, or None if the file could not be loaded
+        """
+        try:
+            with open(schema_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size < SCHEMA_MMAP_THRESHOLD:
+                    schema_data = orjson.loads(f.read())
+                else:
+                    # Parse straight from the page cache, skipping the read() copy
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                        schema_data = orjson.loads(view)
+            logger.info("Loaded custom schema from %s", schema_path)
+            return schema_data
+            
+        except Exception as e:
+            if strict:
+                raise
+            logger.error("Error loading schema from %s: %s", schema_path, e)
+            return None
+    
     def _load_default_schemas(self):
         """Load and cache default schemas."""
         try:
@@ -252,41 +443,47 @@ class SchemaLoader:
             self._create_default_schema_files()
             
         except Exception as e:
-            logger.error(f"Error loading default schemas: {str(e)}")
+            logger.error("Error loading default schemas: %s", e)
     
     def _create_default_schema_files(self):
         """Create default schema files for common tools."""
-        default_schemas = {
-            "todoist.json": self._get_todoist_schemas(),
-            "memory.json": self._get_memory_schemas()
-        }
+        # One directory scan instead of an exists() check per file; usually nothing is missing
+        existing = {entry.name for entry in self._scan_schema_files()}
         
-        for filename, schemas in default_schemas.items():
-            schema_file = self.schemas_dir / filename
+        for filename, schemas in _DEFAULT_SCHEMA_FILES.items():
+            if filename in existing:
+                continue
             
-            if not schema_file.exists():
-                try:
-                    with open(schema_file, 'w', encoding='utf-8') as f:
-                        json.dump(schemas, f, indent=2)
-                    logger.info(f"Created default schema file: {filename}")
-                except Exception as e:
-                    logger.error(f"Error creating schema file {filename}: {str(e)}")
+            try:
+                with open(self.schemas_dir / filename, 'wb') as f:
+                    f.write(orjson.dumps(schemas, option=orjson.OPT_INDENT_2))
+                logger.info("Created default schema file: %s", filename)
+            except Exception as e:
+                logger.error("Error creating schema file %s: %s", filename, e)
     
     def reload_schemas(self) -> bool:
         """
         Reload all schemas from files.
         
+        The previously loaded schemas and validators are kept when any schema file
+        fails to load or the rebuild finds no schemas at all, so a broken schema file
+        never drops tools or their argument validation.
+        
         Returns:
             True if successful, False otherwise
         """
+        previous = (dict(self._schemas_cache), self._schemas_by_name, self._validators, self._dir_mtime)
         try:
-            self._schemas_cache.clear()
-            self._load_default_schemas()
+            self._create_default_schema_files()
+            schemas = self._build_schemas(self._get_dir_mtime(), strict=True)
+            if not schemas:
+                raise ValueError("no tool schemas found")
             logger.info("Schemas reloaded successfully")
             return True
             
         except Exception as e:
-            logger.error(f"Error reloading schemas: {str(e)}")
+            self._schemas_cache, self._schemas_by_name, self._validators, self._dir_mtime = previous
+            logger.error("Error reloading schemas, keeping previous schemas: %s", e)
             return False
     
     def validate_schema(self, schema: Dict[str, Any]) -> bool:
@@ -300,21 +497,21 @@ class SchemaLoader:
             True if valid, False otherwise
         """
         try:
-            # Basic validation
-            if not isinstance(schema, dict):
-                return False
-            
-            if "type" not in schema or schema["type"] != "function":
-                return False
-            
-            if "function" not in schema:
-                return False
-            
-            function = schema["function"]
-            if "name" not in function or "description" not in function:
-                return False
-            
+            _validate_tool_schema(schema)
             return True
             
-        except Exception:
-            return False 
\ No newline at end of file
+        except fastjsonschema.JsonSchemaException:
+            return False
+
+@lru_cache(maxsize=None)
+def get_schema_loader(schemas_dir: str = "schemas") -> SchemaLoader:
+    """
+    Get the process-wide schema loader for a directory, creating it on first use.
+    
+    Args:
+        schemas_dir: Directory containing schema JSON files
+        
+    Returns:
+        Shared SchemaLoader instance
+    """
+    return SchemaLoader(schemas_dir)
\ No newline at end of file
@@ -5,12 +5,67 @@ Provides functions for managing tasks and projects in Todoist.
 
 import logging
 import os
-import requests
-from typing import Dict, Any, List, Optional
-from datetime import datetime
+import time
+import uuid
+import httpx
+import ijson
+import orjson
+from typing import Dict, Any, List, Optional, AsyncIterator
+from datetime import datetime, timezone
 
 logger = logging.getLogger(__name__)
 
+# The Sync API accepts at most 100 commands per request
+SYNC_COMMAND_LIMIT = 100
+
+# Fields returned for projects and tasks, with the default used when the API omits one
+# (a missing task labels list is filled in by _format_task)
+_PROJECT_FIELDS = (
+    ("id", None), ("name", None), ("color", None), ("parent_id", None), ("order", None),
+    ("is_favorite", False), ("is_inbox_project", False), ("is_team_inbox", False),
+    ("view_style", None), ("url", None)
+)
+_TASK_FIELDS = (
+    ("id", None), ("content", None), ("project_id", None), ("due", None), ("priority", None),
+    ("status", None), ("description", None), ("labels", None), ("created_at", None), ("url", None),
+    ("comment_count", 0), ("assignee_id", None), ("assigner_id", None), ("parent_id", None),
+    ("order", None), ("section_id", None), ("parent", None), ("section", None)
+)
+
+def _format_task(task: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Project a Todoist task onto the fields returned to callers.
+    
+    Args:
+        task: Task object from the Todoist API
+        
+    Returns:
+        Task dictionary with every field in _TASK_FIELDS
+    """
+    formatted = {key: task.get(key, default) for key, default in _TASK_FIELDS}
+    if "labels" not in task:
+        # A fresh list per task, like the API's own labels; a shared default could be mutated
+        formatted["labels"] = []
+    return formatted
+
+class _AsyncByteReader:
+    """Adapt an async byte iterator to the async file-like read() that ijson consumes."""
+    
+    __slots__ = ("_chunks",)
+    
+    def __init__(self, chunks: AsyncIterator[bytes]):
+        self._chunks = chunks
+    
+    async def read(self, size: int = -1) -> bytes:
+        # ijson probes with read(0) to detect bytes vs str; don't consume a chunk for it
+        if size == 0:
+            return b""
+        # An empty chunk would read as EOF, so only return once data arrives
+        async for chunk in self._chunks:
+            if chunk:
+                return chunk
+        return b""
+
 class TodoistMCPService:
     """Service for Todoist integration using Model Context Protocol."""
     
@@ -18,16 +73,29 @@ class TodoistMCPService:
         """Initialize the Todoist MCP service."""
         self.api_token = os.getenv("TODOIST_API_TOKEN")
         self.base_url = "https://api.todoist.com/rest/v2"
+        self.sync_url = "https://api.todoist.com/sync/v9/sync"
         self.mcp_server_url = os.getenv("TODOIST_MCP_SERVER_URL", "http://localhost:3000")
         
         if not self.api_token:
             logger.warning("TODOIST_API_TOKEN not set - Todoist integration will be limited")
         
-        # Set up headers for API requests
+        # Set up headers for API requests once; the client sends them on every call.
+        # httpx adds Content-Type itself for JSON bodies, so GETs and DELETEs don't carry it
         self.headers = {
-            "Authorization": f"Bearer {self.api_token}",
-            "Content-Type": "application/json"
+            "Authorization": f"Bearer {self.api_token}"
         } if self.api_token else {}
+        
+        # Reuse keep-alive connections, and await requests so they don't block the event loop
+        self.client = httpx.AsyncClient(
+            headers=self.headers,
+            timeout=10.0,
+            http2=True,
+            limits=httpx.Limits(max_connections=16, max_keepalive_connections=4)
+        )
+    
+    async def aclose(self):
+        """Close the pooled HTTP connections."""
+        await self.client.aclose()
     
     async def add_task(
         self, 
@@ -54,22 +122,23 @@ class TodoistMCPService:
         """
         try:
             # TODO: Implement actual Todoist API call via MCP
-            logger.info(f"Adding Todoist task: {content}")
+            logger.info("Adding Todoist task: %s", content)
             
-            # Stub implementation
+            # Stub implementation; read the clock once for both the ID and timestamp
+            ts = time.time_ns()
             task_data = {
-                "id": f"task_{datetime.now().timestamp()}",
+                "id": f"task_{ts}",
                 "content": content,
                 "project_id": project_id,
                 "due": {"date": due_date} if due_date else None,
                 "priority": priority,
                 "description": description,
                 "labels": labels or [],
-                "created_at": datetime.now().isoformat(),
+                "created_at": datetime.fromtimestamp(ts / 1e9, timezone.utc).isoformat(),
                 "status": "pending"
             }
             
-            logger.info(f"Successfully created task: {task_data['id']}")
+            logger.info("Successfully created task: %s", task_data['id'])
             return {
                 "success": True,
                 "task": task_data,
@@ -77,7 +146,7 @@ class TodoistMCPService:
             }
             
         except Exception as e:
-            logger.error(f"Error adding Todoist task: {str(e)}")
+            logger.error("Error adding Todoist task: %s", e)
             return {
                 "success": False,
                 "error": str(e),
@@ -103,31 +172,17 @@ class TodoistMCPService:
             logger.info("Fetching Todoist projects from API")
             
             # Make API request to get projects
-            response = requests.get(
-                f"{self.base_url}/projects",
-                headers=self.headers,
-                timeout=10
-            )
+            response = await self.client.get(f"{self.base_url}/projects")
             
             if response.status_code == 200:
-                projects = response.json()
-                logger.info(f"Successfully fetched {len(projects)} projects")
+                projects = orjson.loads(response.content)
+                logger.info("Successfully fetched %s projects", len(projects))
                 
                 # Format projects for consistency
-                formatted_projects = []
-                for project in projects:
-                    formatted_projects.append({
-                        "id": project.get("id"),
-                        "name": project.get("name"),
-                        "color": project.get("color"),
-                        "parent_id": project.get("parent_id"),
-                        "order": project.get("order"),
-                        "is_favorite": project.get("is_favorite", False),
-                        "is_inbox_project": project.get("is_inbox_project", False),
-                        "is_team_inbox": project.get("is_team_inbox", False),
-                        "view_style": project.get("view_style"),
-                        "url": project.get("url")
-                    })
+                formatted_projects = [
+                    {key: project.get(key, default) for key, default in _PROJECT_FIELDS}
+                    for project in projects
+                ]
                 
                 return {
                     "success": True,
@@ -135,22 +190,22 @@ class TodoistMCPService:
                     "count": len(formatted_projects)
                 }
             else:
-                logger.error(f"Todoist API error: {response.status_code} - {response.text}")
+                logger.error("Todoist API error: %s - %s", response.status_code, response.text)
                 return {
                     "success": False,
                     "error": f"API request failed: {response.status_code}",
                     "projects": []
                 }
             
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Network error fetching Todoist projects: {str(e)}")
+        except httpx.HTTPError as e:
+            logger.error("Network error fetching Todoist projects: %s", e)
             return {
                 "success": False,
                 "error": f"Network error: {str(e)}",
                 "projects": []
             }
         except Exception as e:
-            logger.error(f"Error fetching Todoist projects: {str(e)}")
+            logger.error("Error fetching Todoist projects: %s", e)
             return {
                 "success": False,
                 "error": str(e),
@@ -176,7 +231,7 @@ class TodoistMCPService:
                     "tasks": []
                 }
             
-            logger.info(f"Fetching Todoist tasks for project: {project_id}")
+            logger.info("Fetching Todoist tasks for project: %s", project_id)
             
             # Build query parameters
             params = {}
@@ -184,64 +239,42 @@ class TodoistMCPService:
             if project_id and project_id.isdigit():
                 params["project_id"] = project_id
             
-            # Make API request to get tasks
-            response = requests.get(
-                f"{self.base_url}/tasks",
-                headers=self.headers,
-                params=params,
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                tasks = response.json()
-                logger.info(f"Successfully fetched {len(tasks)} tasks")
-                
-                # Format tasks for consistency
-                formatted_tasks = []
-                for task in tasks:
-                    formatted_tasks.append({
-                        "id": task.get("id"),
-                        "content": task.get("content"),
-                        "project_id": task.get("project_id"),
-                        "due": task.get("due"),
-                        "priority": task.get("priority"),
-                        "status": task.get("status"),
-                        "description": task.get("description"),
-                        "labels": task.get("labels", []),
-                        "created_at": task.get("created_at"),
-                        "url": task.get("url"),
-                        "comment_count": task.get("comment_count", 0),
-                        "assignee_id": task.get("assignee_id"),
-                        "assigner_id": task.get("assigner_id"),
-                        "parent_id": task.get("parent_id"),
-                        "order": task.get("order"),
-                        "section_id": task.get("section_id"),
-                        "parent": task.get("parent"),
-                        "section": task.get("section")
-                    })
-                
-                return {
-                    "success": True,
-                    "tasks": formatted_tasks,
-                    "count": len(formatted_tasks)
-                }
-            else:
-                logger.error(f"Todoist API error: {response.status_code} - {response.text}")
-                return {
-                    "success": False,
-                    "error": f"API request failed: {response.status_code}",
-                    "tasks": []
-                }
-            
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Network error fetching Todoist tasks: {str(e)}")
+            # Make API request to get tasks, streaming the body so each task is
+            # formatted as it is parsed instead of materializing the raw list first
+            async with self.client.stream("GET", f"{self.base_url}/tasks", params=params) as response:
+                if response.status_code == 200:
+                    # Format tasks for consistency
+                    formatted_tasks = [
+                        _format_task(task)
+                        async for task in ijson.items_async(
+                            _AsyncByteReader(response.aiter_bytes()), "item", use_float=True
+                        )
+                    ]
+                    logger.info("Successfully fetched %s tasks", len(formatted_tasks))
+                    
+                    return {
+                        "success": True,
+                        "tasks": formatted_tasks,
+                        "count": len(formatted_tasks)
+                    }
+                else:
+                    await response.aread()
+                    logger.error("Todoist API error: %s - %s", response.status_code, response.text)
+                    return {
+                        "success": False,
+                        "error": f"API request failed: {response.status_code}",
+                        "tasks": []
+                    }
+            
+        except httpx.HTTPError as e:
+            logger.error("Network error fetching Todoist tasks: %s", e)
             return {
                 "success": False,
                 "error": f"Network error: {str(e)}",
                 "tasks": []
             }
         except Exception as e:
-            logger.error(f"Error fetching Todoist tasks: {str(e)}")
+            logger.error("Error fetching Todoist tasks: %s", e)
             return {
                 "success": False,
                 "error": str(e),
@@ -268,19 +301,17 @@ class TodoistMCPService:
                     "message": "Failed to update task"
                 }
             
-            logger.info(f"Updating Todoist task: {task_id}")
+            logger.info("Updating Todoist task: %s", task_id)
             
             # Make API request to update task
-            response = requests.post(
+            response = await self.client.post(
                 f"{self.base_url}/tasks/{task_id}",
-                headers=self.headers,
-                json=updates,
-                timeout=10
+                json=updates
             )
             
             if response.status_code == 200:
-                task_data = response.json()
-                logger.info(f"Successfully updated task: {task_id}")
+                task_data = orjson.loads(response.content)
+                logger.info("Successfully updated task: %s", task_id)
                 return {
                     "success": True,
                     "task_id": task_id,
@@ -288,22 +319,22 @@ class TodoistMCPService:
                     "message": "Task updated successfully"
                 }
             else:
-                logger.error(f"Todoist API error: {response.status_code} - {response.text}")
+                logger.error("Todoist API error: %s - %s", response.status_code, response.text)
                 return {
                     "success": False,
                     "error": f"API request failed: {response.status_code}",
                     "message": "Failed to update task"
                 }
             
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Network error updating Todoist task: {str(e)}")
+        except httpx.HTTPError as e:
+            logger.error("Network error updating Todoist task: %s", e)
             return {
                 "success": False,
                 "error": f"Network error: {str(e)}",
                 "message": "Failed to update task"
             }
         except Exception as e:
-            logger.error(f"Error updating Todoist task: {str(e)}")
+            logger.error("Error updating Todoist task: %s", e)
             return {
                 "success": False,
                 "error": str(e),
@@ -329,39 +360,35 @@ class TodoistMCPService:
                     "message": "Failed to close task"
                 }
             
-            logger.info(f"Closing Todoist task: {task_id}")
+            logger.info("Closing Todoist task: %s", task_id)
             
             # Make API request to close task
-            response = requests.post(
-                f"{self.base_url}/tasks/{task_id}/close",
-                headers=self.headers,
-                timeout=10
-            )
+            response = await self.client.post(f"{self.base_url}/tasks/{task_id}/close")
             
             if response.status_code == 204:  # No content for successful close
-                logger.info(f"Successfully closed task: {task_id}")
+                logger.info("Successfully closed task: %s", task_id)
                 return {
                     "success": True,
                     "task_id": task_id,
                     "message": "Task closed successfully"
                 }
             else:
-                logger.error(f"Todoist API error: {response.status_code} - {response.text}")
+                logger.error("Todoist API error: %s - %s", response.status_code, response.text)
                 return {
                     "success": False,
                     "error": f"API request failed: {response.status_code}",
                     "message": "Failed to close task"
                 }
             
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Network error closing Todoist task: {str(e)}")
+        except httpx.HTTPError as e:
+            logger.error("Network error closing Todoist task: %s", e)
             return {
                 "success": False,
                 "error": f"Network error: {str(e)}",
                 "message": "Failed to close task"
             }
         except Exception as e:
-            logger.error(f"Error closing Todoist task: {str(e)}")
+            logger.error("Error closing Todoist task: %s", e)
             return {
                 "success": False,
                 "error": str(e),
@@ -387,45 +414,139 @@ class TodoistMCPService:
                     "message": "Failed to delete task"
                 }
             
-            logger.info(f"Deleting Todoist task: {task_id}")
+            logger.info("Deleting Todoist task: %s", task_id)
             
             # Make API request to delete task
-            response = requests.delete(
-                f"{self.base_url}/tasks/{task_id}",
-                headers=self.headers,
-                timeout=10
-            )
+            response = await self.client.delete(f"{self.base_url}/tasks/{task_id}")
             
             if response.status_code == 204:  # No content for successful delete
-                logger.info(f"Successfully deleted task: {task_id}")
+                logger.info("Successfully deleted task: %s", task_id)
                 return {
                     "success": True,
                     "task_id": task_id,
                     "message": "Task deleted successfully"
                 }
             else:
-                logger.error(f"Todoist API error: {response.status_code} - {response.text}")
+                logger.error("Todoist API error: %s - %s", response.status_code, response.text)
                 return {
                     "success": False,
                     "error": f"API request failed: {response.status_code}",
                     "message": "Failed to delete task"
                 }
             
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Network error deleting Todoist task: {str(e)}")
+        except httpx.HTTPError as e:
+            logger.error("Network error deleting Todoist task: %s", e)
             return {
                 "success": False,
                 "error": f"Network error: {str(e)}",
                 "message": "Failed to delete task"
             }
         except Exception as e:
-            logger.error(f"Error deleting Todoist task: {str(e)}")
+            logger.error("Error deleting Todoist task: %s", e)
             return {
                 "success": False,
                 "error": str(e),
                 "message": "Failed to delete task"
             }
     
+    async def batch_delete_tasks(self, task_ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Delete several tasks with Sync API commands instead of one request per task.
+        
+        Args:
+            task_ids: IDs of the tasks to delete
+            
+        Returns:
+            List of delete results, in the same order and shape as delete_task results
+        """
+        if not self.api_token:
+            logger.warning("No Todoist API token available")
+            return [
+                {
+                    "success": False,
+                    "error": "No Todoist API token configured",
+                    "message": "Failed to delete task"
+                }
+                for _ in task_ids
+            ]
+        
+        results = []
+        for start in range(0, len(task_ids), SYNC_COMMAND_LIMIT):
+            chunk = task_ids[start:start + SYNC_COMMAND_LIMIT]
+            commands = [
+                {"type": "item_delete", "uuid": str(uuid.uuid4()), "args": {"id": task_id}}
+                for task_id in chunk
+            ]
+            
+            try:
+                logger.info("Deleting %s Todoist tasks in one sync request", len(chunk))
+                
+                response = await self.client.post(
+                    self.sync_url,
+                    json={"commands": commands}
+                )
+                
+                if response.status_code == 200:
+                    body = orjson.loads(response.content)
+                    sync_status = body.get("sync_status") if isinstance(body, dict) else None
+                    if not isinstance(sync_status, dict):
+                        raise ValueError(f"unexpected sync response: {response.text[:200]}")
+                    for task_id, command in zip(chunk, commands):
+                        status = sync_status.get(command["uuid"])
+                        if status == "ok":
+                            results.append({
+                                "success": True,
+                                "task_id": task_id,
+                                "message": "Task deleted successfully"
+                            })
+                        else:
+                            error = status.get("error") if isinstance(status, dict) else status
+                            logger.error("Todoist sync error deleting task %s: %s", task_id, error)
+                            results.append({
+                                "success": False,
+                                "task_id": task_id,
+                                "error": f"Sync command failed: {error}",
+                                "message": "Failed to delete task"
+                            })
+                else:
+                    logger.error("Todoist API error: %s - %s", response.status_code, response.text)
+                    results.extend(
+                        {
+                            "success": False,
+                            "task_id": task_id,
+                            "error": f"API request failed: {response.status_code}",
+                            "message": "Failed to delete task"
+                        }
+                        for task_id in chunk
+                    )
+                    
+            except httpx.HTTPError as e:
+                logger.error("Network error deleting Todoist tasks: %s", e)
+                results.extend(
+                    {
+                        "success": False,
+                        "task_id": task_id,
+                        "error": f"Network error: {str(e)}",
+                        "message": "Failed to delete task"
+                    }
+                    for task_id in chunk
+                )
+            except ValueError as e:
+                # Undecodable body (orjson.JSONDecodeError) or no sync_status mapping;
+                # only this chunk's commands are in doubt, earlier chunks keep their results
+                logger.error("Invalid Todoist sync response deleting tasks: %s", e)
+                results.extend(
+                    {
+                        "success": False,
+                        "task_id": task_id,
+                        "error": f"Invalid sync response: {str(e)}",
+                        "message": "Failed to delete task"
+                    }
+                    for task_id in chunk
+                )
+                
+        return results
+    
     async def get_labels(self) -> Dict[str, Any]:
         """
         Get all Todoist labels.
@@ -450,7 +571,7 @@ class TodoistMCPService:
             }
             
         except Exception as e:
-            logger.error(f"Error fetching Todoist labels: {str(e)}")
+            logger.error("Error fetching Todoist labels: %s", e)
             return {
                 "success": False,
                 "error": str(e),
@@ -469,7 +590,7 @@ class TodoistMCPService:
             Response from MCP server
         """
         # TODO: Implement actual MCP client communication
-        logger.info(f"Making MCP request: {method}")
+        logger.info("Making MCP request: %s", method)
         
         # Stub implementation
         return {
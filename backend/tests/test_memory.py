@@ -0,0 +1,38 @@
+"""
+Tests for the interaction counters in user memory.
+"""
+
+import asyncio
+
+from services.memory import HISTORY_LIMIT, MemoryService
+
+def _record_interactions(memory_service, user_id, count):
+    async def record():
+        memory = memory_service.load_memory(user_id)
+        for index in range(count):
+            # Same update as ChatService._update_memory
+            memory["conversation_history"].append({
+                "user_input": f"message {index}",
+                "ai_response": "ok",
+                "tools_used": [],
+                "timestamp": index
+            })
+            memory["interaction_count"] = memory.get("interaction_count", 0) + 1
+            await memory_service.save_memory(user_id, memory)
+        await memory_service.flush_all()
+    
+    asyncio.run(record())
+
+def test_lifetime_interactions_outlive_history_window(tmp_path):
+    memory_service = MemoryService(str(tmp_path))
+    _record_interactions(memory_service, "user", HISTORY_LIMIT + 5)
+    memory_service.close()
+    
+    # A fresh service reads everything back from the database
+    memory_service = MemoryService(str(tmp_path))
+    stats = memory_service.get_memory_stats("user")
+    memory_service.close()
+    
+    assert stats["conversation_count"] == HISTORY_LIMIT
+    assert stats["interaction_count"] == HISTORY_LIMIT + 5
+    assert stats["lifetime_interactions"] == HISTORY_LIMIT + 5
@@ -0,0 +1,36 @@
+"""
+Regression tests for the tool-call parser.
+"""
+
+import time
+
+from utils.parser import _parse_json_tool_calls, parse_tool_calls
+
+def _calls(response):
+    return [(tool_call.action, tool_call.args) for tool_call in parse_tool_calls(response)]
+
+def test_unparseable_json_span_does_not_hide_later_action():
+    response = 'Your project {Work} is ready. action: add_task\nThen: {"action": "get_tasks", "args": {}}'
+    
+    assert ("add_task", {}) in _calls(response)
+
+def test_stray_braces_do_not_hide_function_call():
+    response = "Use {braces} carefully. call get_projects(x=1) and later {...}"
+    
+    assert ("get_projects", {"x": 1}) in _calls(response)
+
+def test_json_items_without_args_are_skipped_on_both_paths():
+    # Validated as one list
+    candidate = '[{"action": "get_tasks"}, {"action": "add_task", "args": {}}]'
+    assert [tool_call.action for tool_call in _parse_json_tool_calls(candidate)] == ["add_task"]
+    
+    # Validated item by item after a malformed optional field
+    candidate = '[{"action": "get_tasks"}, {"action": "add_task", "args": {}}, {"action": "get_projects", "args": {}, "confidence": "high"}]'
+    assert [tool_call.action for tool_call in _parse_json_tool_calls(candidate)] == ["add_task"]
+
+def test_bracket_heavy_response_does_not_backtrack():
+    response = '"action" and "args" ' + '[{' * 2000
+    
+    start = time.perf_counter()
+    assert _calls(response) == []
+    assert time.perf_counter() - start < 2
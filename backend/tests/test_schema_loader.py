@@ -0,0 +1,30 @@
+"""
+Tests for reloading tool schemas from disk.
+"""
+
+from services.schema_loader import SchemaLoader
+
+_PING_SCHEMA = '{"type": "function", "function": {"name": "ping", "parameters": {"type": "object", "required": ["host"]}}}'
+
+def _tool_names(loader):
+    return {schema["function"]["name"] for schema in loader.get_available_schemas()}
+
+def test_reload_picks_up_new_schema_file(tmp_path):
+    loader = SchemaLoader(str(tmp_path))
+    (tmp_path / "ping.json").write_text(_PING_SCHEMA)
+    
+    assert loader.reload_schemas() is True
+    assert "ping" in _tool_names(loader)
+    assert loader.validate_args("ping", {}) is not None
+
+def test_reload_with_corrupt_file_keeps_previous_schemas(tmp_path):
+    (tmp_path / "ping.json").write_text(_PING_SCHEMA)
+    loader = SchemaLoader(str(tmp_path))
+    tool_names = _tool_names(loader)
+    assert "ping" in tool_names
+    
+    (tmp_path / "ping.json").write_text('{"type": "function", "function": ')
+    
+    assert loader.reload_schemas() is False
+    assert _tool_names(loader) == tool_names
+    assert loader.validate_args("ping", {}) is not None
@@ -2,14 +2,110 @@
 Parser utility for parsing GPT-4o output into structured tool calls.
 """
 
-import json
 import logging
+import orjson
 import re
-from typing import List, Dict, Any, Optional
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
+from pydantic import TypeAdapter, ValidationError
 from api.models import ToolCall
 
 logger = logging.getLogger(__name__)
 
+# Identical responses (retries, cached completions) are only parsed once; longer
+# responses skip the cache because hashing them costs about as much as parsing
+PARSE_CACHE_SIZE = 1024
+PARSE_CACHE_MAX_LENGTH = 16 * 1024
+
+# Patterns are compiled once at import instead of going through re's cache on every call.
+# Patterns that capture nothing scan the lowercased response without IGNORECASE; those
+# that capture task text keep IGNORECASE on the original so the text keeps its case.
+_NATURAL_PATTERNS = [
+    (re.compile(pattern, 0 if scan_lower else re.IGNORECASE), action, args_extractor, scan_lower, keywords)
+    for pattern, action, args_extractor, scan_lower, keywords in [
+        (r"add.*task.*['\"]([^'\"]+)['\"]", "add_task", lambda m: {"content": m.group(1)}, False, ("add", "task")),
+        (r"create.*task.*['\"]([^'\"]+)['\"]", "add_task", lambda m: {"content": m.group(1)}, False, ("create", "task")),
+        (r"show.*projects", "get_projects", lambda m: {}, True, ("show", "projects")),
+        (r"list.*projects", "get_projects", lambda m: {}, True, ("list", "projects")),
+        (r"get.*projects", "get_projects", lambda m: {}, True, ("get", "projects")),
+        (r"show.*tasks", "get_tasks", lambda m: {}, True, ("show", "tasks")),
+        (r"list.*tasks", "get_tasks", lambda m: {}, True, ("list", "tasks")),
+        (r"get.*tasks", "get_tasks", lambda m: {}, True, ("get", "tasks")),
+        (r"complete.*task.*['\"]([^'\"]+)['\"]", "complete_task", lambda m: {"task_id": m.group(1)}, False, ("complete", "task")),
+        (r"mark.*task.*['\"]([^'\"]+)['\"].*complete", "complete_task", lambda m: {"task_id": m.group(1)}, False, ("mark", "task", "complete")),
+    ]
+]
+
+# Every keyword the natural-language patterns need, checked once per response
+_NATURAL_KEYWORDS = frozenset(keyword for *_, keywords in _NATURAL_PATTERNS for keyword in keywords)
+
+def _first(span: str, name: str) -> str:
+    """
+    Build a regex that consumes text up to the first occurrence of span and never backtracks.
+    
+    The lazy span is captured inside a lookahead, which re treats as atomic, and then
+    consumed with a backreference: an emulated atomic group for Pythons before 3.11.
+    
+    Args:
+        span: Regex for the text to stop at
+        name: Group name for the captured text, unique within the pattern
+        
+    Returns:
+        Regex source
+    """
+    return rf'(?=(?P<{name}>.*?{span}))(?P={name})'
+
+# JSON, function-call and action syntaxes fused into one alternation, so the response
+# is scanned once; each alternative ends in a named group that match.lastgroup reports.
+# Only the JSON alternatives span lines, as when they were separate DOTALL patterns.
+# The inline JSON spans each stop at the first occurrence of the next token; a later
+# occurrence can never rescue a failed match, so they are atomic and bracket-heavy
+# text no longer backtracks through every combination of brackets.
+_TOOL_CALL_ALTERNATIVES = (
+    r'(?s:```json\s*(?P<json_block>\[.*?\])\s*```)',
+    r'(?s:```\s*(?P<fenced_block>\[.*?\])\s*```)',
+    r'(?s:(?P<json_array>\[' + _first(r'\{', "_a1") + _first('"action"', "_a2") + _first('"args"', "_a3")
+    + _first(r'\}', "_a4") + _first(r'\]', "_a5") + '))',
+    r'(?s:(?P<json_object>\{' + _first('"action"', "_o1") + _first('"args"', "_o2") + _first(r'\}', "_o3") + '))',
+    r'function:\s*(?P<function_name>\w+)\s*args:\s*(?P<function_args>\{.*?\})',
+    r'call\s+(?P<call_name>\w+)\s*\((?P<call_args>[^)]+)\)',
+    r'action:\s*(?P<action>\w+)',
+    r'(?:perform|execute|run)\s+(?P<verb_action>\w+)',
+    r'(?P<keyed_name>\w+)\s*:\s*(?P<keyed_args>\{.*?\})'
+)
+_TOOL_CALL_PATTERN = re.compile("|".join(_TOOL_CALL_ALTERNATIVES), re.IGNORECASE)
+
+# The inline JSON alternatives still rescan the rest of the response from every bracket.
+# They can only match when both keys are present, so other responses use this variant.
+_TOOL_CALL_PATTERN_WITHOUT_JSON_KEYS = re.compile(
+    "|".join(alternative for alternative in _TOOL_CALL_ALTERNATIVES if '"action"' not in alternative),
+    re.IGNORECASE
+)
+
+# Validates a whole JSON candidate in one call instead of constructing items one by one
+_TOOL_CALL_LIST_ADAPTER = TypeAdapter(List[ToolCall])
+
+_JSON_GROUPS = frozenset({"json_block", "fenced_block", "json_array", "json_object"})
+# Argument group -> action name group for the function-call alternatives
+_FUNCTION_GROUPS = {"function_args": "function_name", "call_args": "call_name", "keyed_args": "keyed_name"}
+_ACTION_GROUPS = frozenset({"action", "verb_action"})
+
+# Argument patterns for _extract_nearby_args, keyed by the argument they capture
+_ARG_PATTERNS = [
+    (arg_name, re.compile(pattern, re.IGNORECASE))
+    for arg_name, pattern in [
+        ("content", r'content["\s]*:["\s]*["\']([^"\']+)["\']'),
+        ("project_id", r'project_id["\s]*:["\s]*["\']([^"\']+)["\']'),
+        ("due_date", r'due_date["\s]*:["\s]*["\']([^"\']+)["\']'),
+        ("priority", r'priority["\s]*:["\s]*(\d+)'),
+        ("description", r'description["\s]*:["\s]*["\']([^"\']+)["\']'),
+        ("labels", r'labels["\s]*:["\s]*\[([^\]]+)\]')
+    ]
+]
+
+_KV_PATTERN = re.compile(r'(\w+)\s*[:=]\s*([^,\s]+)')
+_BOOL_VALUES = {"true": True, "false": False}
+
 def parse_tool_calls(gpt_response: str) -> List[ToolCall]:
     """
     Parse GPT-4o response to extract structured tool calls.
@@ -20,36 +116,55 @@ def parse_tool_calls(gpt_response: str) -> List[ToolCall]:
     Returns:
         List of ToolCall objects
     """
-    tool_calls = []
-    
     try:
-        # Method 1: Look for JSON tool calls in the response
-        json_tool_calls = _extract_json_tool_calls(gpt_response)
-        if json_tool_calls:
-            tool_calls.extend(json_tool_calls)
-        
-        # Method 2: Look for function call patterns
-        function_calls = _extract_function_calls(gpt_response)
-        if function_calls:
-            tool_calls.extend(function_calls)
-        
-        # Method 3: Look for action patterns
-        action_calls = _extract_action_calls(gpt_response)
-        if action_calls:
-            tool_calls.extend(action_calls)
-        
-        # Method 4: Look for natural language tool requests
-        natural_calls = _extract_natural_tool_requests(gpt_response)
-        if natural_calls:
-            tool_calls.extend(natural_calls)
+        if len(gpt_response) > PARSE_CACHE_MAX_LENGTH:
+            tool_calls = list(_extract_tool_calls(gpt_response))
+        else:
+            # Cached ToolCall objects are shared between calls, so hand out copies
+            tool_calls = [tool_call.model_copy(deep=True) for tool_call in _extract_tool_calls_cached(gpt_response)]
+            logger.debug("Tool call parse cache: %s", _extract_tool_calls_cached.cache_info())
         
-        logger.info(f"Parsed {len(tool_calls)} tool calls from response")
+        logger.info("Parsed %s tool calls from response", len(tool_calls))
         return tool_calls
         
     except Exception as e:
-        logger.error(f"Error parsing tool calls: {str(e)}")
+        logger.error("Error parsing tool calls: %s", e)
         return []
 
+def _extract_tool_calls(gpt_response: str) -> Tuple[ToolCall, ...]:
+    """
+    Run every extractor over a GPT-4o response.
+    
+    Args:
+        gpt_response: Raw response from GPT-4o
+        
+    Returns:
+        Tuple of unique ToolCall objects, structured syntaxes before natural language requests
+    """
+    # Lowercased once for every case-insensitive prefilter and lookup below
+    response_lower = gpt_response.lower()
+    
+    # Methods 1-3: JSON, function call and action patterns, in one pass
+    tool_calls = _extract_structured_tool_calls(gpt_response, response_lower)
+    
+    # Method 4: Look for natural language tool requests
+    natural_calls = _extract_natural_tool_requests(gpt_response, response_lower)
+    if natural_calls:
+        tool_calls.extend(natural_calls)
+    
+    # Several patterns often match the same request; keep the first, most confident one
+    unique_calls = []
+    seen = set()
+    for tool_call in tool_calls:
+        key = (tool_call.action, orjson.dumps(tool_call.args, option=orjson.OPT_SORT_KEYS, default=str))
+        if key not in seen:
+            seen.add(key)
+            unique_calls.append(tool_call)
+    
+    return tuple(unique_calls)
+
+_extract_tool_calls_cached = lru_cache(maxsize=PARSE_CACHE_SIZE)(_extract_tool_calls)
+
 def parse_openai_tool_calls(openai_response) -> List[ToolCall]:
     """
     Parse tool calls directly from OpenAI response object.
@@ -68,229 +183,268 @@ def parse_openai_tool_calls(openai_response) -> List[ToolCall]:
             if hasattr(choice.message, 'tool_calls') and choice.message.tool_calls:
                 for tool_call in choice.message.tool_calls:
                     try:
-                        # Parse the function arguments
-                        args = json.loads(tool_call.function.arguments) if tool_call.function.arguments else {}
-                        
-                        tool_calls.append(ToolCall(
-                            action=tool_call.function.name,
-                            args=args,
-                            confidence=1.0
+                        tool_calls.append(_build_api_tool_call(
+                            tool_call.function.name, tool_call.function.arguments, tool_call.id
                         ))
+                        logger.debug("Parsed OpenAI tool call: %s", tool_call.function.name)
                         
-                        logger.info(f"Parsed OpenAI tool call: {tool_call.function.name}")
-                        
-                    except json.JSONDecodeError as e:
-                        logger.warning(f"Failed to parse tool call arguments: {e}")
-                        # Try to use raw arguments as string
-                        tool_calls.append(ToolCall(
-                            action=tool_call.function.name,
-                            args={"raw_args": tool_call.function.arguments},
-                            confidence=0.8
-                        ))
                     except Exception as e:
-                        logger.error(f"Error parsing tool call: {e}")
+                        logger.error("Error parsing tool call: %s", e)
                         continue
         
-        logger.info(f"Parsed {len(tool_calls)} OpenAI tool calls")
+        logger.info("Parsed %s OpenAI tool calls", len(tool_calls))
         return tool_calls
         
     except Exception as e:
-        logger.error(f"Error parsing OpenAI tool calls: {str(e)}")
+        logger.error("Error parsing OpenAI tool calls: %s", e)
         return []
 
-def _extract_natural_tool_requests(response: str) -> List[ToolCall]:
+def parse_streamed_tool_calls(streamed_calls: List[Dict[str, str]]) -> List[ToolCall]:
+    """
+    Parse tool calls accumulated from a streamed OpenAI response.
+    
+    Args:
+        streamed_calls: List of dicts with 'id', 'name' and concatenated 'arguments'
+        
+    Returns:
+        List of ToolCall objects
+    """
+    tool_calls = []
+    
+    for streamed_call in streamed_calls:
+        name = streamed_call.get("name")
+        arguments = streamed_call.get("arguments")
+        tool_call_id = streamed_call.get("id") or None
+        if not name:
+            continue
+        
+        tool_calls.append(_build_api_tool_call(name, arguments, tool_call_id))
+    
+    logger.info("Parsed %s streamed tool calls", len(tool_calls))
+    return tool_calls
+
+def _build_api_tool_call(name: str, arguments: Optional[str], tool_call_id: Optional[str]) -> ToolCall:
+    """
+    Build a tool call from the function name and JSON arguments of an OpenAI tool call.
+    
+    Streamed and non-streamed responses both go through here, so unusable arguments
+    are treated the same way whichever API path produced them.
+    
+    Args:
+        name: Function name from the tool call
+        arguments: JSON-encoded arguments string
+        tool_call_id: OpenAI tool call ID
+        
+    Returns:
+        ToolCall object, carrying the raw arguments string if they are not a JSON object
+    """
+    try:
+        args = orjson.loads(arguments) if arguments else {}
+        return ToolCall(action=name, args=args, confidence=1.0, tool_call_id=tool_call_id)
+        
+    except (orjson.JSONDecodeError, ValidationError) as e:
+        # Malformed JSON, or JSON that is not an arguments object (null, a list, ...)
+        logger.warning("Failed to parse tool call arguments: %s", e)
+        return ToolCall.model_construct(
+            action=name,
+            args={"raw_args": arguments},
+            confidence=0.8,
+            tool_call_id=tool_call_id
+        )
+
+def _extract_natural_tool_requests(response: str, response_lower: str) -> List[ToolCall]:
     """
     Extract tool requests from natural language in the response.
     
     Args:
         response: GPT response text
+        response_lower: Lowercased response text
         
     Returns:
         List of ToolCall objects
     """
+    # Every pattern names tasks or projects, so most chit-chat can skip all the scans
+    if "task" not in response_lower and "project" not in response_lower:
+        return []
+    
+    # Only run the patterns whose literal keywords all occur in the response
+    present = {keyword for keyword in _NATURAL_KEYWORDS if keyword in response_lower}
+    
     tool_calls = []
+    append_tool_call = tool_calls.append
     
     # Look for natural language patterns that indicate tool usage
-    patterns = [
-        (r"add.*task.*['\"]([^'\"]+)['\"]", "add_task", lambda m: {"content": m.group(1)}),
-        (r"create.*task.*['\"]([^'\"]+)['\"]", "add_task", lambda m: {"content": m.group(1)}),
-        (r"show.*projects", "get_projects", lambda m: {}),
-        (r"list.*projects", "get_projects", lambda m: {}),
-        (r"get.*projects", "get_projects", lambda m: {}),
-        (r"show.*tasks", "get_tasks", lambda m: {}),
-        (r"list.*tasks", "get_tasks", lambda m: {}),
-        (r"get.*tasks", "get_tasks", lambda m: {}),
-        (r"complete.*task.*['\"]([^'\"]+)['\"]", "complete_task", lambda m: {"task_id": m.group(1)}),
-        (r"mark.*task.*['\"]([^'\"]+)['\"].*complete", "complete_task", lambda m: {"task_id": m.group(1)}),
-    ]
-    
-    for pattern, action, args_extractor in patterns:
-        matches = re.findall(pattern, response, re.IGNORECASE)
-        for match in matches:
+    for pattern, action, args_extractor, scan_lower, keywords in _NATURAL_PATTERNS:
+        if not present.issuperset(keywords):
+            continue
+        for match in pattern.finditer(response_lower if scan_lower else response):
             try:
-                if isinstance(match, tuple):
-                    args = args_extractor(match)
-                else:
-                    args = args_extractor(match)
-                
-                tool_calls.append(ToolCall(
+                append_tool_call(ToolCall.model_construct(
                     action=action,
-                    args=args,
+                    args=args_extractor(match),
                     confidence=0.7  # Lower confidence for natural language parsing
                 ))
                 
             except Exception as e:
-                logger.warning(f"Error parsing natural tool request: {str(e)}")
+                logger.warning("Error parsing natural tool request: %s", e)
                 continue
     
     return tool_calls
 
-def _extract_json_tool_calls(response: str) -> List[ToolCall]:
+def _extract_structured_tool_calls(response: str, response_lower: str) -> List[ToolCall]:
     """
-    Extract tool calls from JSON format in the response.
+    Extract JSON, function-call and action syntaxes in a single walk over the response.
     
     Args:
         response: GPT response text
+        response_lower: Lowercased response text
         
     Returns:
-        List of ToolCall objects
+        List of ToolCall objects in the order they appear
     """
     tool_calls = []
-    
-    # Look for JSON blocks that might contain tool calls
-    json_patterns = [
-        r'```json\s*(\[.*?\])\s*```',
-        r'```\s*(\[.*?\])\s*```',
-        r'\{.*?"action".*?"args".*?\}',
-        r'\[.*?\{.*?"action".*?"args".*?\}.*?\]'
-    ]
-    
-    for pattern in json_patterns:
-        matches = re.findall(pattern, response, re.DOTALL | re.IGNORECASE)
-        for match in matches:
-            try:
-                # Try to parse as JSON
-                if isinstance(match, str):
-                    data = json.loads(match)
-                else:
-                    data = match
-                
-                # Handle both single tool call and array of tool calls
-                if isinstance(data, list):
-                    for item in data:
-                        if _is_valid_tool_call(item):
-                            tool_calls.append(ToolCall(**item))
-                elif _is_valid_tool_call(data):
-                    tool_calls.append(ToolCall(**data))
-                    
-            except json.JSONDecodeError:
-                continue
-            except Exception as e:
-                logger.warning(f"Error parsing JSON tool call: {str(e)}")
-                continue
+    # An action's arguments depend only on the response and the action name, so a
+    # repeated action would rebuild an identical call that is deduplicated anyway
+    seen_actions = set()
+    
+    # Literal prefilter: only pay for the JSON object alternatives when they can match
+    if '"action"' in response_lower and '"args"' in response_lower:
+        pattern = _TOOL_CALL_PATTERN
+    else:
+        pattern = _TOOL_CALL_PATTERN_WITHOUT_JSON_KEYS
+    
+    match = pattern.search(response)
+    while match:
+        kind = match.lastgroup
+        # Resume after the match by default; a JSON span that yields nothing (say a
+        # stray '{' in prose) resumes one character in, so calls it swallowed are found
+        next_pos = match.end()
+        if kind in _JSON_GROUPS:
+            json_tool_calls = _parse_json_tool_calls(match.group(kind))
+            if json_tool_calls:
+                tool_calls.extend(json_tool_calls)
+            else:
+                next_pos = match.start() + 1
+        elif kind in _FUNCTION_GROUPS:
+            tool_call = _parse_function_call(match.group(_FUNCTION_GROUPS[kind]), match.group(kind))
+            if tool_call:
+                tool_calls.append(tool_call)
+        elif kind in _ACTION_GROUPS:
+            action = match.group(kind)
+            if action not in seen_actions:
+                seen_actions.add(action)
+                tool_call = _parse_action_call(response, response_lower, action)
+                if tool_call:
+                    tool_calls.append(tool_call)
+        match = pattern.search(response, next_pos)
     
     return tool_calls
 
-def _extract_function_calls(response: str) -> List[ToolCall]:
+def _parse_json_tool_calls(candidate: str) -> List[ToolCall]:
     """
-    Extract function calls from text patterns.
+    Parse tool calls from a JSON candidate found in the response.
     
     Args:
-        response: GPT response text
+        candidate: Text matched by one of the JSON alternatives
         
     Returns:
         List of ToolCall objects
     """
-    tool_calls = []
+    try:
+        data = orjson.loads(candidate)
+    except orjson.JSONDecodeError:
+        return []
     
-    # Look for function call patterns
-    function_patterns = [
-        r'function:\s*(\w+)\s*args:\s*(\{.*?\})',
-        r'call\s+(\w+)\s*\(([^)]+)\)',
-        r'(\w+)\s*:\s*(\{.*?\})'
-    ]
+    # Handle both single tool call and array of tool calls; only items with both an
+    # action and an args object count, whichever path builds them
+    items = data if isinstance(data, list) else [data]
+    items = [item for item in items if _is_valid_tool_call(item)]
+    try:
+        return _TOOL_CALL_LIST_ADAPTER.validate_python(items)
+    except ValidationError:
+        pass
     
-    for pattern in function_patterns:
-        matches = re.findall(pattern, response, re.IGNORECASE)
-        for match in matches:
-            try:
-                if len(match) == 2:
-                    action, args_str = match
-                    
-                    # Try to parse args as JSON
-                    try:
-                        args = json.loads(args_str)
-                    except json.JSONDecodeError:
-                        # If not JSON, try to parse as key-value pairs
-                        args = _parse_key_value_pairs(args_str)
-                    
-                    tool_calls.append(ToolCall(
-                        action=action.strip(),
-                        args=args if isinstance(args, dict) else {"raw_args": args_str}
-                    ))
-                    
-            except Exception as e:
-                logger.warning(f"Error parsing function call: {str(e)}")
-                continue
+    # Some item has a malformed optional field; keep the ones that construct
+    tool_calls = []
+    for item in items:
+        try:
+            tool_calls.append(ToolCall(**item))
+        except Exception as e:
+            logger.warning("Error parsing JSON tool call: %s", e)
     
     return tool_calls
 
-def _extract_action_calls(response: str) -> List[ToolCall]:
+def _parse_function_call(action: str, args_str: str) -> Optional[ToolCall]:
     """
-    Extract action calls from text patterns.
+    Build a tool call from a function-call match.
     
     Args:
-        response: GPT response text
+        action: Matched function name
+        args_str: Matched argument text
         
     Returns:
-        List of ToolCall objects
+        ToolCall object, or None if it could not be built
     """
-    tool_calls = []
-    
-    # Look for action patterns
-    action_patterns = [
-        r'action:\s*(\w+)',
-        r'perform\s+(\w+)',
-        r'execute\s+(\w+)',
-        r'run\s+(\w+)'
-    ]
-    
-    for pattern in action_patterns:
-        matches = re.findall(pattern, response, re.IGNORECASE)
-        for match in matches:
-            try:
-                action = match.strip()
-                
-                # Look for arguments near the action
-                args = _extract_nearby_args(response, action)
-                
-                tool_calls.append(ToolCall(
-                    action=action,
-                    args=args
-                ))
-                
-            except Exception as e:
-                logger.warning(f"Error parsing action call: {str(e)}")
-                continue
+    try:
+        # Try to parse args as JSON
+        try:
+            args = orjson.loads(args_str)
+        except orjson.JSONDecodeError:
+            # If not JSON, try to parse as key-value pairs
+            args = _parse_key_value_pairs(args_str)
+        
+        # Regex groups are strs and args is always a dict here, so skip validation
+        return ToolCall.model_construct(
+            action=action.strip(),
+            args=args if isinstance(args, dict) else {"raw_args": args_str}
+        )
+        
+    except Exception as e:
+        logger.warning("Error parsing function call: %s", e)
+        return None
+
+def _parse_action_call(response: str, response_lower: str, action: str) -> Optional[ToolCall]:
+    """
+    Build a tool call from an action match, picking up arguments written near it.
     
-    return tool_calls
+    Args:
+        response: GPT response text
+        response_lower: Lowercased response text
+        action: Matched action name
+        
+    Returns:
+        ToolCall object, or None if it could not be built
+    """
+    try:
+        action = action.strip()
+        
+        # Look for arguments near the action
+        args = _extract_nearby_args(response, response_lower, action)
+        
+        return ToolCall.model_construct(
+            action=action,
+            args=args
+        )
+        
+    except Exception as e:
+        logger.warning("Error parsing action call: %s", e)
+        return None
 
-def _is_valid_tool_call(data: Dict[str, Any]) -> bool:
+def _is_valid_tool_call(data: Any) -> bool:
     """
-    Check if a dictionary represents a valid tool call.
+    Check if a value represents a valid tool call.
     
     Args:
-        data: Dictionary to validate
+        data: Decoded JSON value to validate
         
     Returns:
         True if valid, False otherwise
     """
+    # Decoded JSON only ever holds exact dicts and strs, so type() identity suffices
     return (
-        isinstance(data, dict) and
-        "action" in data and
-        isinstance(data["action"], str) and
-        "args" in data and
-        isinstance(data["args"], dict)
+        type(data) is dict and
+        type(data.get("action")) is str and
+        type(data.get("args")) is dict
     )
 
 def _parse_key_value_pairs(text: str) -> Dict[str, Any]:
@@ -306,26 +460,26 @@ def _parse_key_value_pairs(text: str) -> Dict[str, Any]:
     result = {}
     
     # Simple key-value parsing
-    pairs = re.findall(r'(\w+)\s*[:=]\s*([^,\s]+)', text)
-    for key, value in pairs:
-        # Try to convert value to appropriate type
-        if value.lower() in ('true', 'false'):
-            result[key] = value.lower() == 'true'
-        elif value.isdigit():
+    for match in _KV_PATTERN.finditer(text):
+        key, value = match.groups()
+        # Try to convert value to appropriate type, cheapest conversion first
+        try:
             result[key] = int(value)
-        elif value.replace('.', '').isdigit():
-            result[key] = float(value)
-        else:
-            result[key] = value
+        except ValueError:
+            try:
+                result[key] = float(value)
+            except ValueError:
+                result[key] = _BOOL_VALUES.get(value.lower(), value)
     
     return result
 
-def _extract_nearby_args(response: str, action: str) -> Dict[str, Any]:
+def _extract_nearby_args(response: str, response_lower: str, action: str) -> Dict[str, Any]:
     """
     Extract arguments that appear near an action in the response.
     
     Args:
         response: Full response text
+        response_lower: Lowercased response text
         action: Action name to search near
         
     Returns:
@@ -334,36 +488,24 @@ def _extract_nearby_args(response: str, action: str) -> Dict[str, Any]:
     args = {}
     
     # Look for the action in the response
-    action_index = response.lower().find(action.lower())
+    action_index = response_lower.find(action.lower())
     if action_index == -1:
         return args
     
-    # Extract text around the action
+    # Search the text around the action in place rather than slicing out a copy
     start = max(0, action_index - 200)
     end = min(len(response), action_index + 200)
-    context = response[start:end]
     
     # Look for common argument patterns
-    arg_patterns = [
-        r'content["\s]*:["\s]*["\']([^"\']+)["\']',
-        r'project_id["\s]*:["\s]*["\']([^"\']+)["\']',
-        r'due_date["\s]*:["\s]*["\']([^"\']+)["\']',
-        r'priority["\s]*:["\s]*(\d+)',
-        r'description["\s]*:["\s]*["\']([^"\']+)["\']',
-        r'labels["\s]*:["\s]*\[([^\]]+)\]'
-    ]
-    
-    for pattern in arg_patterns:
-        matches = re.findall(pattern, context, re.IGNORECASE)
-        for match in matches:
-            if pattern.startswith('priority'):
-                args['priority'] = int(match)
-            elif pattern.startswith('labels'):
-                args['labels'] = [label.strip().strip('"\'') for label in match.split(',')]
+    for arg_name, pattern in _ARG_PATTERNS:
+        for match in pattern.finditer(response, start, end):
+            value = match.group(1)
+            if arg_name == 'priority':
+                args['priority'] = int(value)
+            elif arg_name == 'labels':
+                args['labels'] = [label.strip().strip('"\'') for label in value.split(',')]
             else:
-                # Extract the argument name from the pattern
-                arg_name = pattern.split('[')[0].split('"')[1]
-                args[arg_name] = match
+                args[arg_name] = value
     
     return args
 
@@ -381,12 +523,14 @@ def format_tool_calls_for_display(tool_calls: List[ToolCall]) -> str:
         return "No tool calls detected"
     
     formatted = []
+    append_line = formatted.append
     for i, tool_call in enumerate(tool_calls, 1):
-        formatted.append(f"{i}. {tool_call.action}")
+        append_line(f"{i}. {tool_call.action}")
         if tool_call.args:
-            formatted.append(f"   Args: {json.dumps(tool_call.args, indent=2)}")
+            args_json = orjson.dumps(tool_call.args, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+            append_line(f"   Args: {args_json}")
         if tool_call.confidence != 1.0:
-            formatted.append(f"   Confidence: {tool_call.confidence}")
+            append_line(f"   Confidence: {tool_call.confidence}")
     
     return "\n".join(formatted)
 
@@ -401,18 +545,13 @@ def validate_tool_call(tool_call: ToolCall) -> bool:
         True if valid, False otherwise
     """
     try:
-        # Check required fields
-        if not tool_call.action or not isinstance(tool_call.action, str):
-            return False
-        
-        if not isinstance(tool_call.args, dict):
-            return False
-        
-        # Check confidence range
-        if not (0.0 <= tool_call.confidence <= 1.0):
-            return False
-        
-        return True
+        # Check required fields and confidence range
+        return (
+            bool(tool_call.action) and
+            type(tool_call.action) is str and
+            type(tool_call.args) is dict and
+            0.0 <= tool_call.confidence <= 1.0
+        )
         
     except Exception:
         return False 
\ No newline at end of file
@@ -59,6 +59,7 @@ const Chat: React.FC<ChatProps> = ({ userId = "kristofer" }) => {
         body: JSON.stringify({
           user_id: userId,
           user_input: userInput,
+          include_metadata: false,
         }),
       });
 